@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+# videobox render benchmark
+# Renders every video command against synthetic inputs.
+# Run from the repository root: python -m benchmarks.render
+
+'''Render Benchmark File'''
+
+import os
+import json
+import time
+import uuid
+import shutil
+import argparse
+import resource
+import tempfile
+import statistics
+import multiprocessing
+import ffmpeg
+import psutil
+from extensions.utils.render_worker import RenderJob, PIPELINES, run_job
+
+COMMANDS = ['crabrave', 'theboys', 'discordvid2', 'tobecontinued', 'wellberightback', 'fnafjumpscare']
+BACKENDS = ['moviepy', 'ffmpeg']
+RESOLUTIONS = ['640x360', '1280x720', '1920x1080']
+DURATIONS = [5, 15, 30]
+
+# What each command takes as input
+INPUTS = {
+    'crabrave': None,
+    'theboys': 'photo',
+    'discordvid2': 'video',
+    'tobecontinued': 'video',
+    'wellberightback': 'video',
+    'fnafjumpscare': 'video'
+}
+
+TEXT = {
+    'crabrave': ['BENCHMARK', 'IS GONE'],
+    'discordvid2': ['@VideoBox#0000', '@benchmark#0000']
+}
+
+def make_video(path, duration, size):
+    """Generates a synthetic test clip with a sine tone."""
+    video = ffmpeg.input(f'testsrc=size={size}:rate=30', f='lavfi', t=duration)
+    audio = ffmpeg.input('sine=frequency=440', f='lavfi', t=duration)
+    ffmpeg.output(video, audio, path, vcodec='libx264', acodec='aac', preset='ultrafast')\
+        .run(quiet=True, overwrite_output=True)
+
+def make_photo(path, size):
+    """Generates a synthetic test picture."""
+    ffmpeg.input(f'testsrc=size={size}', f='lavfi').output(path, vframes=1)\
+        .run(quiet=True, overwrite_output=True)
+
+def cases(commands, backends, resolutions, durations):
+    """Yields every (command, backend, resolution, duration) to benchmark. Commands
+    without an input only run once, and pictures only vary by resolution."""
+    for command in commands:
+        for backend in backends:
+            if (command, backend) not in PIPELINES:
+                continue
+            if not INPUTS[command]:
+                yield command, backend, None, None
+                continue
+            for resolution in resolutions:
+                if INPUTS[command] == 'photo':
+                    yield command, backend, resolution, None
+                    continue
+                for duration in durations:
+                    yield command, backend, resolution, duration
+
+def measure(job):
+    """Runs a job in a child process and returns the wall time, CPU time and peak RSS of its process tree."""
+    process = multiprocessing.Process(target=run_job, args=(job,))
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    process.start()
+    tree = psutil.Process(process.pid)
+    peak = 0
+    while process.is_alive():
+        try:
+            rss = tree.memory_info().rss + sum(child.memory_info().rss for child in tree.children(recursive=True))
+            peak = max(peak, rss)
+        except psutil.Error:
+            pass
+        time.sleep(0.05)
+    process.join()
+    wall = time.perf_counter() - start
+    if process.exitcode != 0:
+        raise RuntimeError(f'{job.command} exited with code {process.exitcode}')
+
+    # Children count the CPU time of FFmpeg processes they waited for
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (after.ru_utime + after.ru_stime) - (usage.ru_utime + usage.ru_stime)
+    return wall, cpu, peak
+
+def case_name(result):
+    return ' '.join(str(result[key]) for key in ['command', 'backend', 'resolution', 'duration'] if result[key])
+
+def compare(results, baseline_path):
+    """Prints how each result changed from a baseline run."""
+    with open(baseline_path) as f:
+        baseline = {case_name(result): result for result in json.load(f)}
+    for result in results:
+        old = baseline.get(case_name(result))
+        if not old:
+            continue
+        changes = ', '.join(
+            f"{key} {(result[key] - old[key]) / old[key] * 100:+.1f}%"
+            for key in ['wall_median', 'cpu_median', 'peak_rss', 'output_size'] if old.get(key))
+        print(f'{case_name(result):>40}: {changes}')
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the render pipelines of every video command.')
+    parser.add_argument('--input', help='video to render instead of the generated test clips, whatever the resolution and duration')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--commands', nargs='+', default=COMMANDS, choices=COMMANDS)
+    parser.add_argument('--backends', nargs='+', default=BACKENDS, choices=BACKENDS)
+    parser.add_argument('--resolutions', nargs='+', default=RESOLUTIONS)
+    parser.add_argument('--durations', nargs='+', type=int, default=DURATIONS)
+    parser.add_argument('--json', help='file to write the results to')
+    parser.add_argument('--compare', help='results from an earlier run to compare against')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='videobox-bench-')
+    inputs = {}
+
+    def get_input(command, resolution, duration):
+        kind = INPUTS[command]
+        if not kind:
+            return []
+        if kind == 'video' and args.input:
+            return [args.input]
+        key = (kind, resolution, duration)
+        if key not in inputs:
+            if kind == 'photo':
+                inputs[key] = os.path.join(workdir, f'photo-{resolution}.png')
+                make_photo(inputs[key], resolution)
+            else:
+                inputs[key] = os.path.join(workdir, f'video-{resolution}-{duration}.mp4')
+                make_video(inputs[key], duration, resolution)
+        return [inputs[key]]
+
+    results = []
+    try:
+        for (command, backend, resolution, duration) in cases(args.commands, args.backends, args.resolutions, args.durations):
+            walls, cpus, peaks, sizes = [], [], [], []
+            for _ in range(args.runs):
+                job = RenderJob(command, os.path.join(workdir, f'{uuid.uuid4().hex}.mp4'),
+                    inputs=get_input(command, resolution, duration), text=TEXT.get(command),
+                    options={'backend': backend})
+                wall, cpu, peak = measure(job)
+                walls.append(wall)
+                cpus.append(cpu)
+                peaks.append(peak)
+                sizes.append(os.path.getsize(job.output))
+                os.remove(job.output)
+            result = {
+                'command': command,
+                'backend': backend,
+                'resolution': resolution,
+                'duration': duration,
+                'wall_median': statistics.median(walls),
+                'wall_min': min(walls),
+                'cpu_median': statistics.median(cpus),
+                'peak_rss': max(peaks),
+                'output_size': statistics.median(sizes)
+            }
+            results.append(result)
+            print(f"{case_name(result):>40}: {result['wall_median']:7.2f}s median, {result['cpu_median']:7.2f}s CPU, "
+                f"{result['peak_rss'] / 1048576:7.1f} MB peak RSS, {result['output_size'] / 1048576:5.2f} MB output")
+    finally:
+        shutil.rmtree(workdir)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == '__main__':
+    main()
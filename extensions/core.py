@@ -57,6 +57,9 @@ class Core(commands.Cog):
         currproc = psutil.Process(os.getpid())
         usage = self.bot.utils.humanbytes(currproc.memory_info().rss)
         proc_start = datetime.fromtimestamp(currproc.create_time())
+        pool_stats = self.bot.render_pool.stats()
+        # Renders only use the render thread pool when render processes are off
+        render_stats = pool_stats.get('process', pool_stats['render'])
         embed = discord.Embed(
             title="VideoBox Information",
             description='\n'.join([
@@ -66,6 +69,7 @@ class Core(commands.Cog):
                 F"**`💻` Version:** {ctx.bot.config['version']}",
                 f"**`🕰️` Uptime:** {humanize.naturaldelta(datetime.now() - proc_start)}",
                 f"**`⚙️` Memory Usage:** {usage}",
+                f"**`📹` Renders:** {render_stats['active']}/{render_stats['size']} active, {render_stats['queued']} queued",
                 f"**`🗄️` Servers:** {len(ctx.bot.guilds):,}",
                 f"**`🗄️` Shards:** {len(ctx.bot.shards):,}",
                 f"**`🗂️` Commands:** {len(ctx.bot.commands):,}",
@@ -285,9 +285,12 @@ class Developer(commands.Cog):
         """Clears the current cache."""
         count = 0
 
-        for file in os.listdir('./cache'):
-            count += 1
-            os.remove(f"./cache/{file}")
+        for root, dirs, files in os.walk('./cache', topdown=False):
+            for file in files:
+                count += 1
+                os.remove(os.path.join(root, file))
+            for folder in dirs:
+                os.rmdir(os.path.join(root, folder))
 
         for file in os.listdir('.'):
             if file.endswith('.mp3'):
@@ -296,6 +299,33 @@ class Developer(commands.Cog):
 
         await ctx.send(f"`🗑️` Deleted **`{count:,}`** files.")
 
+    @commands.command(aliases=["perf"])
+    @checks.is_bot_owner()
+    async def telemetry(self, ctx, command: str = None):
+        """Shows render stage percentiles of a command, or how many times each command rendered."""
+        telemetry = self.bot.telemetry
+
+        if command is None:
+            if not telemetry.counts:
+                return await ctx.send("`📊` Nothing has been rendered yet.")
+            msg = "**Traced Commands**\n\n"
+            msg += '\n'.join(
+                f'`{name}`: **`{count:,}`** runs, **`{telemetry.failures.get(name, 0):,}`** failed'
+                for (name, count) in telemetry.counts.items())
+            return await ctx.send(msg)
+
+        stages = telemetry.percentiles(command)
+        if not stages:
+            return await ctx.send(f"`📊` No traces of **`{command}`** yet.")
+
+        lines = [f"{'stage':<10}{'p50':>9}{'p95':>9}{'p99':>9}{'n':>6}"]
+        for (name, p) in stages.items():
+            lines.append(f"{name:<10}{p['p50']:>8.2f}s{p['p95']:>8.2f}s{p['p99']:>8.2f}s{p['count']:>6}")
+        for (name, p) in telemetry.percentiles(command, 'sizes').items():
+            lines.append(f"{name:<10}" + ''.join(f"{p[key] / 1000000:>7.2f}MB" for key in ['p50', 'p95', 'p99']) + f"{p['count']:>6}")
+
+        await ctx.send(f"`📊` **`{command}`**\n```\n" + '\n'.join(lines) + "\n```")
+
     async def cog_check(self, ctx):
         return checks.is_bot_owner()(ctx.command)
 
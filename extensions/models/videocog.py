@@ -5,117 +5,198 @@
 
 '''VideoCog File'''
 
+import io
 import os
-import owo
-import uuid
 import time
+import asyncio
+import tempfile
 import ffmpeg
 import discord
 from discord.ext import commands
+from extensions.utils.render_queue import RenderQueueFull
 
 class VideoCog(commands.Cog):
-    async def _send_video(self, ctx, video, clips=[], spoiler=False, preset='ultrafast', threads=4):
-        """Exports and sends the video to the context."""
-        videoname = f"cache/{uuid.uuid4().hex}.mp4"
+    # Attachment limits in MB for each server boost tier
+    UPLOAD_LIMITS = {0: 8, 1: 8, 2: 50, 3: 100}
 
-        start_time = time.time()
+    def _render_job(self, ctx, inputs=None, text=None):
+        """Creates a render job for the current command."""
+        return self.bot.renderer.job(ctx.command.name, inputs=inputs, text=text,
+            queue_depth=self.bot.render_queue.depth, size_limit=self._upload_limit(ctx),
+            # Inputs are downloads in the bot's cache, whose probes the other cogs share
+            probe_sidecars=True)
 
-        file_name = f"{ctx.command.name}.mp4"
-        if spoiler:
-            file_name = "SPOILER_" + file_name
+    def _upload_limit(self, ctx):
+        """Gets the largest file in bytes that can be attached in the context."""
+        limits = dict(self.UPLOAD_LIMITS)
+        limits.update({int(tier): limit for (tier, limit) in (self.bot.config.get('upload_limits') or {}).items()})
+        tier = ctx.guild.premium_tier if ctx.guild else 0
+        return limits.get(tier, limits[0]) * 1000000
+
+    async def _send_render(self, ctx, job, spoiler=False):
+        """Renders a job outside of the bot's thread and sends the video to the context."""
+        start_time = time.time()
 
         # Create cache if it doesn't exist
         if not os.path.exists('./cache'):
             os.makedirs('./cache')
 
-        status_message = await ctx.send(
-            f"`📹` {ctx.author.mention}'s **`{ctx.command.name}`**: Rendering..."
-        )
-        # Write and send file
-        async with ctx.typing():
-            async_write = self.bot.utils.force_async(video.write_videofile)
-            await async_write(videoname, threads=threads, preset=preset, verbose=False, logger=None, audio=True,
-                codec='libx264', audio_codec='libmp3lame', temp_audiofile=f'{videoname}.temp-audio.mp3', remove_temp=False)
-
-            # In the rare case that moviepy doesn't correctly add audio, let FFmpeg do it.
-            if self.bot.config['stitch_mpy_audio']:
-                stream = ffmpeg.output(ffmpeg.input(videoname).video,
-                    ffmpeg.input(f'{videoname}.temp-audio.mp3').audio,
-                    f'{videoname}.final.mp4')
-                async_run = self.bot.utils.force_async(stream.run)
-                await async_run(quiet=True)
-                os.remove(f'{videoname}.temp-audio.mp3')
-                os.remove(videoname)
-                videoname += '.final.mp4'
-            else:
-                os.remove(f'{videoname}.temp-audio.mp3')
+        # Identical renders are served from the result cache
+        cache_key = await self.bot.result_cache.key(job)
+        cached = self.bot.result_cache.get(cache_key, job.options.get('size_limit'))
+        if cached:
+            (videoname, url) = cached
+            try:
+                status_message = await ctx.send(self._status_text(ctx, 'Sending...'))
+                url = await self._send_file(ctx, status_message, videoname, start_time, spoiler, url=url)
+            finally:
+                self.bot.result_cache.release(cache_key)
+            if url:
+                self.bot.result_cache.set_url(cache_key, url)
+            return
 
-            if os.path.getsize(videoname) > 1000000 * 8 and self.bot.config['owo_key']: # 8 MB
-                await status_message.edit(
-                    content=f"`📹` {ctx.author.mention}'s **`{ctx.command.name}`**: Uploading..."
-                )
-                async_upload = self.bot.utils.force_async(owo.upload_files)
-                uploaded_files = await async_upload(self.bot.config['owo_key'], videoname)
-                await status_message.delete()
-                await ctx.send(
-                    f"`📹` Rendered **`{ctx.command.name}`** in {time.time() - start_time:.2f} seconds for {ctx.author.mention}!" +
-                    f"\n`🔗` {'||' if spoiler else ''}https://videobox.is-pretty.cool/{uploaded_files[videoname].split('/')[3]}{'||' if spoiler else ''}"
-                )
-            else:
+        status_message = await ctx.send(self._status_text(ctx, 'Rendering...'))
+        # Render and send file
+        async with ctx.typing():
+            queued = time.perf_counter()
+            try:
+                async with self._render_slot(ctx, status_message):
+                    ctx.trace.add('queue', time.perf_counter() - queued)
+                    result = await self.bot.render_pool.run_job(job)
+                    ctx.trace.merge(result.trace)
+            except RenderQueueFull:
+                # The queue filled up after the admission check, which main.py reports
                 await status_message.delete()
-                await ctx.send(
-                    f"`📹` Rendered **`{ctx.command.name}`** in {time.time() - start_time:.2f} seconds for {ctx.author.mention}!",
-                    file = discord.File(fp=videoname, filename=file_name)
-                )
-
-        # Cleanup
-        for clip in clips:
-            clip.close()
-        video.close()
-        os.remove(videoname)
+                raise
+            videoname = self.bot.result_cache.put(cache_key, result.output)
+            try:
+                url = await self._send_file(ctx, status_message, videoname, start_time, spoiler)
+            finally:
+                # Cleanup
+                if cache_key:
+                    self.bot.result_cache.release(cache_key)
+                else:
+                    os.remove(videoname)
 
-    async def _send_ffmpeg_stream(self, ctx, video, audio, args={}, spoiler=False):
-        """Runs the FFmpeg stream and sends the video to the context."""
-        videoname = f"cache/{uuid.uuid4().hex}.mp4"
+        if cache_key and url:
+            self.bot.result_cache.set_url(cache_key, url)
 
+    async def _send_stream(self, ctx, job, spoiler=False):
+        """Renders a job to a pipe and sends the video to the context."""
         start_time = time.time()
 
-        file_name = f"{ctx.command.name}.mp4"
-        if spoiler:
-            file_name = "SPOILER_" + file_name
-
         # Create cache if it doesn't exist
         if not os.path.exists('./cache'):
             os.makedirs('./cache')
 
-        status_message = await ctx.send(
-            f"`📹` {ctx.author.mention}'s **`{ctx.command.name}`**: Rendering..."
-        )
+        status_message = await ctx.send(self._status_text(ctx, 'Rendering...'))
         # Run and send file
         async with ctx.typing():
-            stream = ffmpeg.output(video, audio, videoname, **args)
-            async_run = self.bot.utils.force_async(stream.run)
-            await async_run(quiet=True)
-            if os.path.getsize(videoname) > 1000000 * 8 and self.bot.config['owo_key']: # 8 MB
-                await status_message.edit(
-                    content=f"`📹` {ctx.author.mention}'s **`{ctx.command.name}`**: Uploading..."
-                )
-                async_upload = self.bot.utils.force_async(owo.upload_files)
-                uploaded_files = await async_upload(self.bot.config['owo_key'], videoname)
+            queued = time.perf_counter()
+            try:
+                async with self._render_slot(ctx, status_message):
+                    ctx.trace.add('queue', time.perf_counter() - queued)
+                    stream = await self.bot.utils.force_async(self.bot.renderer.pipe_stream, pool='io')(job)
+                    with ctx.trace.stage('encode'):
+                        buffer = await self._run_spooled(stream)
+            except RenderQueueFull:
+                await status_message.delete()
+                raise
+            try:
+                await self._send_file(ctx, status_message, buffer, start_time, spoiler)
+            finally:
+                self._close_output(buffer)
+
+    async def _run_spooled(self, stream):
+        """Runs an FFmpeg stream that outputs to a pipe, keeping the output in memory
+        unless it grows past the spool size. Returns a file object to close with _close_output()."""
+        spool_size = self.bot.config.get('output_spool_size', 8) * 1000000
+        # SpooledTemporaryFile isn't an io.IOBase before Python 3.11, which discord.File needs
+        output = io.BytesIO()
+        process = await asyncio.create_subprocess_exec(*stream.compile(),
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+
+        async def read_output():
+            nonlocal output
+            while True:
+                chunk = await process.stdout.read(65536)
+                if not chunk:
+                    break
+                output.write(chunk)
+                if isinstance(output, io.BytesIO) and output.tell() > spool_size:
+                    (fd, path) = tempfile.mkstemp(suffix='.mp4', dir='cache')
+                    os.close(fd)
+                    spilled = open(path, 'w+b')
+                    spilled.write(output.getvalue())
+                    output = spilled
+
+        try:
+            (_, err) = await asyncio.gather(read_output(), process.stderr.read())
+            await process.wait()
+        except BaseException:
+            self._close_output(output)
+            if process.returncode is None:
+                process.kill()
+            raise
+        if process.returncode != 0:
+            self._close_output(output)
+            raise ffmpeg.Error('ffmpeg', None, err)
+        output.seek(0)
+        return output
+
+    def _close_output(self, output):
+        """Closes output from _run_spooled(), deleting it if it spilled to a file."""
+        output.close()
+        if not isinstance(output, io.BytesIO) and os.path.exists(output.name):
+            os.remove(output.name)
+
+    async def _send_file(self, ctx, status_message, video, start_time, spoiler=False, url=None):
+        """Sends a rendered file or file object to the context, uploading it if it's too large.
+        Returns the upload URL if the file was uploaded."""
+        file_name = f"{ctx.command.name}.mp4"
+        if spoiler:
+            file_name = "SPOILER_" + file_name
+
+        if isinstance(video, str):
+            size = os.path.getsize(video)
+        else:
+            video.seek(0, os.SEEK_END)
+            size = video.tell()
+            video.seek(0)
+        ctx.trace.sizes['output'] = size
+
+        if url or (size > self._upload_limit(ctx) and self.bot.uploader.enabled):
+            if not url:
+                await status_message.edit(content=self._status_text(ctx, 'Uploading...'))
+                with ctx.trace.stage('upload'):
+                    url = await self.bot.uploader.upload(video, file_name)
+            with ctx.trace.stage('send'):
                 await status_message.delete()
                 await ctx.send(
                     f"`📹` Rendered **`{ctx.command.name}`** in {time.time() - start_time:.2f} seconds for {ctx.author.mention}!" +
-                    f"\n`🔗` {'||' if spoiler else ''}https://videobox.is-pretty.cool/{uploaded_files[videoname].split('/')[3]}{'||' if spoiler else ''}"
+                    f"\n`🔗` {'||' if spoiler else ''}{url}{'||' if spoiler else ''}"
                 )
-            else:
+            return url
+        else:
+            with ctx.trace.stage('send'):
                 await status_message.delete()
                 await ctx.send(
                     f"`📹` Rendered **`{ctx.command.name}`** in {time.time() - start_time:.2f} seconds for {ctx.author.mention}!",
-                    file = discord.File(fp=videoname, filename=file_name)
+                    file = discord.File(fp=video, filename=file_name)
                 )
 
-        # Cleanup
-        os.remove(videoname)
+    def _status_text(self, ctx, status):
+        return f"`📹` {ctx.author.mention}'s **`{ctx.command.name}`**: {status}"
+
+    def _render_slot(self, ctx, status_message):
+        """Waits in the render queue, showing the position in the status message."""
+        async def on_position(position):
+            if position:
+                await status_message.edit(content=self._status_text(ctx, f'Queued (#{position})...'))
+            else:
+                await status_message.edit(content=self._status_text(ctx, 'Rendering...'))
+
+        return self.bot.render_queue.slot(ctx, on_position)
 
     def _trunc(self, text: str, limit: int = 20) -> str:
         if len(text) <= limit:
@@ -123,35 +204,47 @@ class VideoCog(commands.Cog):
         else:
             return text[limit:] + '...'
 
-    def check_processes(self):
-        return self.bot.videos_processing <= 10
-
     async def _download_video(self, ctx):
         media = await self.bot.utils.find_video(ctx.message)
         if not media:
             await ctx.send('`🛑` Could not find media to use!')
             return None
         try:
-            file_path = await self.bot.utils.download_url(
-                media.url, supported_formats=self.bot.utils.VIDEO_FORMATS, skip_head=media.skip_head)
+            with ctx.trace.stage('download'):
+                file_path = await self.bot.input_cache.fetch(
+                    media.url, supported_formats=self.bot.utils.VIDEO_FORMATS, skip_head=media.skip_head)
         except Exception as error:
             if type(error).__name__ == 'DownloadURLError':
                 await ctx.send(f'`🛑` {error.to_message()}')
             return None
+        ctx.inputs.append(file_path)
+        ctx.trace.sizes['input'] = os.path.getsize(file_path)
         return file_path, media.spoiler
 
+    async def _probe_video(self, ctx, file_path):
+        """Probes a downloaded video, rejecting it if it has no video stream."""
+        with ctx.trace.stage('probe'):
+            info = await self.bot.media_probe.probe(file_path)
+        if not info.has_video:
+            await ctx.send('`🛑` No video stream was found!')
+            return None
+        return info
+
     async def _download_photo(self, ctx, arg=''):
         media = await self.bot.utils.find_photo(ctx.message, arg)
         if not media:
             await ctx.send('`🛑` Could not find media to use!')
             return None
         try:
-            file_path = await self.bot.utils.download_url(
-                media.url, supported_formats=self.bot.utils.PHOTO_FORMATS, skip_head=media.skip_head)
+            with ctx.trace.stage('download'):
+                file_path = await self.bot.input_cache.fetch(
+                    media.url, supported_formats=self.bot.utils.PHOTO_FORMATS, skip_head=media.skip_head)
         except Exception as error:
             if type(error).__name__ == 'DownloadURLError':
                 await ctx.send(f'`🛑` {error.to_message()}')
             return None
+        ctx.inputs.append(file_path)
+        ctx.trace.sizes['input'] = os.path.getsize(file_path)
         return file_path, media.spoiler
 
     async def cog_check(self, ctx):
@@ -164,5 +257,23 @@ class VideoCog(commands.Cog):
         else:
             return True
 
+    async def cog_before_invoke(self, ctx):
+        ctx.trace = self.bot.telemetry.trace(ctx.command.name)
+        # Downloaded inputs, which are given back to the input cache after the command
+        ctx.inputs = []
+        # Reject early instead of downloading media for a render that can't be queued
+        try:
+            self.bot.render_queue.check(ctx)
+        except Exception:
+            ctx.command.reset_cooldown(ctx)
+            raise
+
+    async def cog_after_invoke(self, ctx):
+        # After invoke hooks run even if the command raised
+        for file_path in ctx.inputs:
+            self.bot.input_cache.release(file_path)
+        ctx.trace.failed = ctx.command_failed
+        self.bot.telemetry.finish(ctx.trace)
+
 def setup(bot):
     pass
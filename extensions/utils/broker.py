@@ -0,0 +1,427 @@
+# -*- coding: utf-8 -*-
+
+# videobox broker util
+# Hands render jobs to worker processes on the bot's host.
+
+'''Broker File'''
+
+import os
+import time
+import uuid
+import pickle
+import socket
+import sqlite3
+import asyncio
+import threading
+import multiprocessing
+from contextlib import contextmanager
+
+class RenderFailed(Exception):
+    """A brokered render failed or ran out of attempts."""
+    pass
+
+class Broker():
+    """A queue of render jobs that workers claim, heartbeat and complete.
+    Jobs are requeued if their worker stops heartbeating, up to max_attempts times."""
+
+    def __init__(self, max_attempts=3):
+        self.max_attempts = max_attempts
+
+    def enqueue(self, job):
+        """Adds a job and returns its ID."""
+        raise NotImplementedError
+
+    def claim(self, worker):
+        """Claims the oldest queued job as a (job ID, job) tuple, or None if nothing is queued."""
+        raise NotImplementedError
+
+    def heartbeat(self, job_id, worker):
+        """Marks a claimed job as still running. Returns False if the worker lost the job."""
+        raise NotImplementedError
+
+    def complete(self, job_id, worker, result):
+        raise NotImplementedError
+
+    def fail(self, job_id, worker, error, retry=False):
+        """Fails a job, or requeues it if it can be retried and has attempts left."""
+        raise NotImplementedError
+
+    def requeue_stale(self, timeout):
+        """Requeues or fails jobs whose worker hasn't heartbeated in the timeout."""
+        raise NotImplementedError
+
+    def seen(self, worker):
+        """Marks a worker as polling for jobs."""
+        raise NotImplementedError
+
+    def live_workers(self, timeout):
+        """Counts the workers that polled or heartbeated a job in the timeout."""
+        raise NotImplementedError
+
+    def get(self, job_id):
+        """Gets the (status, result, error) of a job."""
+        raise NotImplementedError
+
+    def remove(self, job_id):
+        raise NotImplementedError
+
+    def stats(self):
+        """Gets how many jobs have each status."""
+        raise NotImplementedError
+
+class MemoryBroker(Broker):
+    """A broker for workers in the bot's own process."""
+
+    def __init__(self, max_attempts=3):
+        super().__init__(max_attempts)
+        self.jobs = {}
+        self.workers = {}
+        self._lock = threading.Lock()
+
+    def enqueue(self, job):
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self.jobs[job_id] = {
+                'job': job, 'status': 'queued', 'attempts': 0, 'worker': None,
+                'heartbeat': None, 'created': time.time(), 'result': None, 'error': None
+            }
+        return job_id
+
+    def claim(self, worker):
+        with self._lock:
+            queued = [(entry['created'], job_id) for (job_id, entry) in self.jobs.items() if entry['status'] == 'queued']
+            if not queued:
+                return None
+            (_, job_id) = min(queued)
+            entry = self.jobs[job_id]
+            entry.update(status='running', worker=worker, heartbeat=time.time(), attempts=entry['attempts'] + 1)
+            return job_id, entry['job']
+
+    def _owned(self, job_id, worker):
+        entry = self.jobs.get(job_id)
+        if entry and entry['status'] == 'running' and entry['worker'] == worker:
+            return entry
+        return None
+
+    def heartbeat(self, job_id, worker):
+        with self._lock:
+            entry = self._owned(job_id, worker)
+            if entry:
+                entry['heartbeat'] = time.time()
+            return bool(entry)
+
+    def complete(self, job_id, worker, result):
+        with self._lock:
+            entry = self._owned(job_id, worker)
+            if entry:
+                entry.update(status='done', result=result)
+
+    def fail(self, job_id, worker, error, retry=False):
+        with self._lock:
+            entry = self._owned(job_id, worker)
+            if not entry:
+                return
+            if retry and entry['attempts'] < self.max_attempts:
+                entry.update(status='queued', worker=None, error=error)
+            else:
+                entry.update(status='failed', error=error)
+
+    def requeue_stale(self, timeout):
+        with self._lock:
+            for entry in self.jobs.values():
+                if entry['status'] == 'running' and entry['heartbeat'] < time.time() - timeout:
+                    if entry['attempts'] < self.max_attempts:
+                        entry.update(status='queued', worker=None)
+                    else:
+                        entry.update(status='failed', error='The render worker stopped responding.')
+
+    def seen(self, worker):
+        with self._lock:
+            self.workers[worker] = time.time()
+
+    def live_workers(self, timeout):
+        with self._lock:
+            since = time.time() - timeout
+            live = set(worker for (worker, seen) in self.workers.items() if seen >= since)
+            live.update(entry['worker'] for entry in self.jobs.values()
+                if entry['status'] == 'running' and entry['heartbeat'] >= since)
+            return len(live)
+
+    def get(self, job_id):
+        with self._lock:
+            entry = self.jobs.get(job_id)
+            if not entry:
+                return None, None, None
+            return entry['status'], entry['result'], entry['error']
+
+    def remove(self, job_id):
+        with self._lock:
+            self.jobs.pop(job_id, None)
+
+    def stats(self):
+        with self._lock:
+            stats = {}
+            for entry in self.jobs.values():
+                stats[entry['status']] = stats.get(entry['status'], 0) + 1
+            return stats
+
+class SQLiteBroker(Broker):
+    """A broker in an SQLite database, for workers in other processes on the same host.
+    The database must be on a local disk, since WAL mode needs shared memory and SQLite's
+    locking isn't reliable on network filesystems like NFS or SMB."""
+
+    def __init__(self, path, max_attempts=3):
+        super().__init__(max_attempts)
+        self.path = path
+        with self._connect() as db:
+            self._create(db)
+
+    def _create(self, db):
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute(
+            'CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, job BLOB, status TEXT, '
+            'attempts INTEGER, worker TEXT, heartbeat REAL, created REAL, result BLOB, error TEXT)')
+        db.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)')
+        db.execute('CREATE TABLE IF NOT EXISTS workers (name TEXT PRIMARY KEY, seen REAL)')
+
+    @contextmanager
+    def _connect(self):
+        # The database is recreated if it was deleted, so the bot and workers outlive it
+        created = not os.path.exists(self.path)
+        if created:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # A write-ahead log left behind by the deleted database would be replayed into the new one
+            for suffix in ('-wal', '-shm'):
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+        # Connections can't be shared between processes or threads, so each call opens its own
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            if created:
+                self._create(db)
+            yield db
+        finally:
+            db.close()
+
+    def enqueue(self, job):
+        job_id = uuid.uuid4().hex
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (id, job, status, attempts, created) VALUES (?, ?, 'queued', 0, ?)",
+                (job_id, pickle.dumps(job), time.time()))
+        return job_id
+
+    def claim(self, worker):
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                row = db.execute(
+                    "SELECT id, job FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1").fetchone()
+                if row:
+                    db.execute(
+                        "UPDATE jobs SET status = 'running', worker = ?, heartbeat = ?, attempts = attempts + 1 WHERE id = ?",
+                        (worker, time.time(), row[0]))
+                db.execute('COMMIT')
+            except BaseException:
+                db.execute('ROLLBACK')
+                raise
+        if not row:
+            return None
+        return row[0], pickle.loads(row[1])
+
+    def heartbeat(self, job_id, worker):
+        with self._connect() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time(), job_id, worker))
+            return cursor.rowcount > 0
+
+    def complete(self, job_id, worker, result):
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = 'done', result = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (pickle.dumps(result), job_id, worker))
+
+    def fail(self, job_id, worker, error, retry=False):
+        with self._connect() as db:
+            if retry:
+                cursor = db.execute(
+                    "UPDATE jobs SET status = 'queued', worker = NULL, error = ? "
+                    "WHERE id = ? AND worker = ? AND status = 'running' AND attempts < ?",
+                    (error, job_id, worker, self.max_attempts))
+                if cursor.rowcount:
+                    return
+            db.execute(
+                "UPDATE jobs SET status = 'failed', error = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (error, job_id, worker))
+
+    def requeue_stale(self, timeout):
+        with self._connect() as db:
+            stale = time.time() - timeout
+            db.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL "
+                "WHERE status = 'running' AND heartbeat < ? AND attempts < ?",
+                (stale, self.max_attempts))
+            db.execute(
+                "UPDATE jobs SET status = 'failed', error = 'The render worker stopped responding.' "
+                "WHERE status = 'running' AND heartbeat < ?",
+                (stale,))
+
+    def seen(self, worker):
+        with self._connect() as db:
+            db.execute('INSERT OR REPLACE INTO workers (name, seen) VALUES (?, ?)', (worker, time.time()))
+
+    def live_workers(self, timeout):
+        since = time.time() - timeout
+        with self._connect() as db:
+            return db.execute(
+                'SELECT COUNT(*) FROM (SELECT name FROM workers WHERE seen >= ? '
+                "UNION SELECT worker FROM jobs WHERE status = 'running' AND heartbeat >= ?)",
+                (since, since)).fetchone()[0]
+
+    def get(self, job_id):
+        with self._connect() as db:
+            row = db.execute('SELECT status, result, error FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if not row:
+            return None, None, None
+        return row[0], pickle.loads(row[1]) if row[1] else None, row[2]
+
+    def remove(self, job_id):
+        with self._connect() as db:
+            db.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+
+    def stats(self):
+        with self._connect() as db:
+            return dict(db.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+
+def get_broker(settings):
+    """Creates the broker described by the render_broker config."""
+    if settings.get('backend', 'memory') == 'sqlite':
+        return SQLiteBroker(settings.get('path', 'broker.db'), settings.get('max_attempts', 3))
+    return MemoryBroker(settings.get('max_attempts', 3))
+
+def _render_child(renderer, job, conn):
+    try:
+        conn.send((True, renderer.render(job)))
+    except Exception as e:
+        conn.send((False, f'{type(e).__name__}: {e}'))
+    finally:
+        conn.close()
+
+class Worker():
+    """Claims jobs from a broker and renders each in a child process,
+    heartbeating while it runs and killing it if it takes too long."""
+
+    def __init__(self, broker, renderer, name=None, heartbeat=5, stale_timeout=30, job_timeout=600, poll=1):
+        self.broker = broker
+        self.renderer = renderer
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}'
+        self.heartbeat_interval = heartbeat
+        self.stale_timeout = stale_timeout
+        self.job_timeout = job_timeout
+        self.poll = poll
+
+    def run(self, stop=None):
+        """Works until the stop event is set."""
+        while not (stop and stop.is_set()):
+            try:
+                self.broker.seen(self.name)
+                self.broker.requeue_stale(self.stale_timeout)
+                claimed = self.broker.claim(self.name)
+                if claimed:
+                    self.run_job(*claimed)
+                    continue
+            except Exception as e:
+                # Errors like a locked database are usually brief, so the worker keeps polling
+                print(f'Worker {self.name}: {type(e).__name__}: {e}')
+            time.sleep(self.poll)
+
+    def run_job(self, job_id, job):
+        (receiver, sender) = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=_render_child, args=(self.renderer, job, sender))
+        process.start()
+        sender.close()
+        start_time = time.time()
+        try:
+            while not receiver.poll(self.heartbeat_interval):
+                if time.time() - start_time > self.job_timeout:
+                    return self.broker.fail(job_id, self.name, 'The render took too long.')
+                if not self.broker.heartbeat(job_id, self.name):
+                    # The job was removed or given to another worker
+                    return
+            try:
+                (ok, value) = receiver.recv()
+            except EOFError:
+                # The render process died, so another worker might have better luck
+                return self.broker.fail(job_id, self.name, 'The render process exited.', retry=True)
+            if ok:
+                self.broker.complete(job_id, self.name, value)
+            else:
+                self.broker.fail(job_id, self.name, value)
+        finally:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+            receiver.close()
+
+class BrokerClient():
+    """Runs render jobs through a broker for the bot, starting in-process workers for the memory backend."""
+
+    def __init__(self, bot, settings):
+        self.bot = bot
+        self.settings = settings
+        self.broker = get_broker(settings)
+        self.poll = settings.get('poll', 0.5)
+        self.stale_timeout = settings.get('stale_timeout', 30)
+        # Jobs that no worker claims in this long fail instead of waiting forever
+        self.queue_timeout = settings.get('queue_timeout', settings.get('job_timeout', 600))
+        self.stop = threading.Event()
+        self.threads = []
+        workers = settings.get('workers', 2 if isinstance(self.broker, MemoryBroker) else 0)
+        if workers:
+            # Imported here so brokers can be used without the render dependencies
+            from .renderer import Renderer
+        for _ in range(workers):
+            worker = Worker(self.broker, Renderer(bot.config),
+                heartbeat=settings.get('heartbeat', 5),
+                stale_timeout=settings.get('stale_timeout', 30),
+                job_timeout=settings.get('job_timeout', 600))
+            thread = threading.Thread(target=worker.run, args=(self.stop,), name='videobox-broker', daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    async def _call(self, fn, *args):
+        return await self.bot.render_pool.submit('io', fn, *args)
+
+    async def run_job(self, job):
+        """Enqueues a job and waits for a worker to render it."""
+        job_id = await self._call(self.broker.enqueue, job)
+        enqueued = time.time()
+        try:
+            while True:
+                await asyncio.sleep(self.poll)
+                (status, result, error) = await self._call(self.broker.get, job_id)
+                if status == 'done':
+                    return result
+                if status == 'failed' or status is None:
+                    raise RenderFailed(error or 'The render was lost.')
+                if status == 'queued':
+                    if time.time() - enqueued > self.queue_timeout:
+                        raise RenderFailed('No render worker took the job in time.')
+                    if not await self._call(self.broker.live_workers, self.stale_timeout):
+                        raise RenderFailed('No render workers are running.')
+        finally:
+            # Removing an unfinished job also makes its worker give up on it
+            await self._call(self.broker.remove, job_id)
+
+    def shutdown(self):
+        self.stop.set()
+
+def setup(bot):
+    settings = bot.config.get('render_broker')
+    bot.render_broker = BrokerClient(bot, settings) if settings else None
+
+def teardown(bot):
+    if bot.render_broker:
+        bot.render_broker.shutdown()
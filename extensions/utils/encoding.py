@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+# videobox encoding util
+# Turns encode profiles into arguments for FFmpeg and MoviePy.
+
+'''Encoding File'''
+
+DEFAULT_PROFILES = {
+    'default': {
+        'vcodec': 'libx264',
+        'preset': 'ultrafast',
+        'crf': None,
+        'video_bitrate': None,
+        'threads': 4,
+        'acodec': 'libmp3lame',
+        'audio_bitrate': None,
+        'pix_fmt': 'yuv420p',
+        'tune': None
+    },
+    # Used when the render queue is deep
+    'draft': {
+        'vcodec': 'libx264',
+        'preset': 'ultrafast',
+        'crf': 32,
+        'video_bitrate': None,
+        'threads': 2,
+        'acodec': 'libmp3lame',
+        'audio_bitrate': '96k',
+        'pix_fmt': 'yuv420p',
+        'tune': 'fastdecode'
+    },
+    'quality': {
+        'vcodec': 'libx264',
+        'preset': 'veryfast',
+        'crf': 23,
+        'video_bitrate': None,
+        'threads': 4,
+        'acodec': 'libmp3lame',
+        'audio_bitrate': '128k',
+        'pix_fmt': 'yuv420p',
+        'tune': None
+    }
+}
+
+# Extensions of files that can hold audio from each codec, for MoviePy's temporary audio
+AUDIO_EXTENSIONS = {
+    'libmp3lame': 'mp3',
+    'mp3': 'mp3',
+    'aac': 'm4a',
+    'libfdk_aac': 'm4a',
+    'libvorbis': 'ogg',
+    'libopus': 'ogg',
+    'flac': 'flac',
+    'pcm_s16le': 'wav'
+}
+
+def audio_extension(codec):
+    """Gets the extension of a file that can hold audio from a codec. Matroska holds anything else."""
+    return AUDIO_EXTENSIONS.get(codec, 'mka')
+
+def get_profiles(config):
+    """Gets every encode profile, with the ones in the config overriding the defaults."""
+    profiles = {name: dict(profile) for name, profile in DEFAULT_PROFILES.items()}
+    for name, profile in (config.get('encode_profiles') or {}).items():
+        profiles[name] = dict(profiles.get(name, DEFAULT_PROFILES['default']), **profile)
+    return profiles
+
+def select_profile(config, command, queue_depth=0):
+    """Picks the encode profile for a command, falling back to the draft profile when the queue is deep."""
+    profiles = get_profiles(config)
+    draft_depth = config.get('draft_queue_depth', 5)
+    if draft_depth and queue_depth >= draft_depth:
+        name = 'draft'
+    else:
+        name = (config.get('command_profiles') or {}).get(command, 'default')
+    return dict(profiles.get(name, profiles['default']), name=name)
+
+def _bits(rate):
+    """Converts a bitrate like '128k' to bits per second."""
+    if isinstance(rate, (int, float)):
+        return int(rate)
+    rate = rate.strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(rate[-1], 1)
+    return int(float(rate.rstrip('km')) * multiplier)
+
+def lowest_bitrate(*rates):
+    """Gets the lowest of some bitrates in bits per second, ignoring unset ones."""
+    rates = [_bits(rate) for rate in rates if rate]
+    return min(rates) if rates else None
+
+def target_bitrate(duration, size_limit, audio_bitrate='128k', margin=0.9):
+    """Gets the video bitrate in bits per second that fits an output of a duration in a size limit.
+    The margin leaves room for the container and rate control overshooting."""
+    total = size_limit * 8 * margin / max(duration, 1)
+    return max(int(total - _bits(audio_bitrate)), 100000)
+
+def fit_bitrate(profile, duration, size_limit):
+    """Gets the highest video bitrate a profile can use to stay under a size limit,
+    or None if the profile's own bitrate already fits."""
+    profile = profile or DEFAULT_PROFILES['default']
+    bitrate = target_bitrate(duration, size_limit, profile.get('audio_bitrate') or '128k')
+    if profile.get('video_bitrate') and _bits(profile['video_bitrate']) <= bitrate:
+        return None
+    return bitrate
+
+def ffmpeg_args(profile=None, bitrate_cap=None):
+    """Gets ffmpeg-python output arguments for a profile, capping the video bitrate if given."""
+    profile = profile or DEFAULT_PROFILES['default']
+    args = {
+        'vcodec': profile['vcodec'],
+        'acodec': profile['acodec'],
+        'preset': profile['preset'],
+        'threads': profile['threads'],
+        'pix_fmt': profile['pix_fmt']
+    }
+    if profile.get('crf') is not None:
+        args['crf'] = profile['crf']
+    if profile.get('video_bitrate'):
+        args['video_bitrate'] = profile['video_bitrate']
+    if profile.get('audio_bitrate'):
+        args['audio_bitrate'] = profile['audio_bitrate']
+    if profile.get('tune'):
+        args['tune'] = profile['tune']
+    if bitrate_cap:
+        args['maxrate'] = bitrate_cap
+        args['bufsize'] = bitrate_cap * 2
+        if 'video_bitrate' in args:
+            args['video_bitrate'] = bitrate_cap
+    return args
+
+def moviepy_args(profile=None, bitrate_cap=None):
+    """Gets write_videofile arguments for a profile, capping the video bitrate if given."""
+    profile = profile or DEFAULT_PROFILES['default']
+    ffmpeg_params = ['-pix_fmt', profile['pix_fmt']]
+    if profile.get('crf') is not None:
+        ffmpeg_params += ['-crf', str(profile['crf'])]
+    if profile.get('tune'):
+        ffmpeg_params += ['-tune', profile['tune']]
+    bitrate = profile.get('video_bitrate')
+    if bitrate_cap:
+        ffmpeg_params += ['-maxrate', str(bitrate_cap), '-bufsize', str(bitrate_cap * 2)]
+        if bitrate:
+            bitrate = str(bitrate_cap)
+    return {
+        'codec': profile['vcodec'],
+        'audio_codec': profile['acodec'],
+        'preset': profile['preset'],
+        'threads': profile['threads'],
+        'bitrate': bitrate,
+        'audio_bitrate': profile.get('audio_bitrate'),
+        'ffmpeg_params': ffmpeg_params
+    }
+
+def setup(bot):
+    pass
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+# videobox extractor util
+# Routes links to the extractor that handles them.
+
+'''Extractor File'''
+
+import re
+import json
+import time
+import base64
+from urllib.parse import urlparse
+from .utils import TwitterAuthException
+
+class Extractor():
+    """Base for extractors, routing a URL straight to the extractor whose host and pattern match it."""
+
+    def __init__(self, bot, kind, extractors):
+        self.bot = bot
+        self.request = bot.request
+        self.kind = kind
+        self.fake_user_agent = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_12_6) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/79.0.3924.0 Safari/537.36'
+
+        # extractors is a list of (method name, hosts, pattern)
+        self.extractors = [name for (name, _, _) in extractors]
+        self.patterns = {}
+        self.hosts = {}
+        self.stats = {}
+        for (name, hosts, pattern) in extractors:
+            self.patterns[name] = re.compile(pattern)
+            self.stats[name] = {'calls': 0, 'errors': 0, 'time': 0.0}
+            for host in hosts:
+                self.hosts.setdefault(host, []).append(name)
+
+    def _route(self, url):
+        """Yields the extractors that match a URL, with their matches."""
+        host = (urlparse(url).hostname or '').lower()
+        if host.startswith('www.'):
+            host = host[4:]
+        for name in self.hosts.get(host, []):
+            match = self.patterns[name].match(url)
+            if match:
+                yield name, match
+
+    async def get_url(self, url):
+        """Gets a media URL from a URL."""
+
+        (found, result) = self.bot.url_cache.get(self.kind, url)
+        if found: return result
+
+        result = None
+        failed = False
+        for (name, match) in self._route(url):
+            stats = self.stats[name]
+            stats['calls'] += 1
+            start_time = time.perf_counter()
+            try:
+                result = await getattr(self, name)(url, match)
+            except Exception as e:
+                # One extractor failing shouldn't stop the others
+                stats['errors'] += 1
+                failed = True
+                print(f'{name}: {type(e).__name__}: {e}')
+                result = None
+            finally:
+                stats['time'] += time.perf_counter() - start_time
+            if result != None: break
+
+        # Errors aren't cached so the link can be retried
+        if result != None or not failed:
+            self.bot.url_cache.set(self.kind, url, result)
+        return result
+
+    def _to_json(self, obj):
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=True)
+
+    async def _refresh_twitter(self):
+        creds = self.bot.config['twitter']
+        auth = base64.b64encode(f"{creds['consumer']}:{creds['secret']}".encode('ascii')).decode("utf-8")
+
+        async with self.request.post(
+            url = "https://api.twitter.com/oauth2/token",
+            headers = {
+                'Authorization': f"Basic {auth}",
+                'Content-Type': "application/x-www-form-urlencoded"
+            },
+            data = 'grant_type=client_credentials'
+        ) as response:
+            if response.status == 403:
+                raise TwitterAuthException(response)
+            self.bot._twitter_token = (await response.json())['access_token']
+            response.close()
+
+def setup(bot):
+    pass
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+# videobox input cache util
+# Shares downloaded media between commands.
+
+'''Input Cache File'''
+
+import os
+import time
+import asyncio
+from collections import OrderedDict
+from .utils import DownloadURLError
+from . import media_info
+
+class InputCacheEntry():
+    """A downloaded file in the input cache."""
+
+    def __init__(self, url, file_path, mime, etag=None):
+        self.url = url
+        self.file_path = file_path
+        self.mime = mime
+        self.etag = etag
+        self.size = os.path.getsize(file_path)
+        self.created = time.time()
+        self.refs = 0
+        self.evicted = False
+
+    def __repr__(self):
+        attrs = [
+            ('url', self.url),
+            ('file_path', self.file_path),
+            ('refs', self.refs),
+        ]
+        return '<%s %s>' % (self.__class__.__name__, ' '.join('%s=%r' % t for t in attrs))
+
+class InputCache():
+    """An LRU cache of downloaded media, keyed by URL and revalidated by ETag.
+    Concurrent fetches of a URL share one download, and files are reference counted
+    so they are only deleted when no command is using them."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.ttl = bot.config.get('input_cache_ttl', 600)
+        self.max_size = bot.config.get('input_cache_size', 500) * 1000000
+        self.entries = OrderedDict()
+        self.paths = {}
+        self.inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.coalesced = 0
+        self.downloaded = 0
+
+    async def fetch(self, url, supported_formats=[], skip_head=False):
+        """Gets a file path for a URL, downloading it if needed. The path must be given back with release()."""
+        # Waits for any download of the same URL to finish
+        while url in self.inflight:
+            self.coalesced += 1
+            try:
+                await asyncio.shield(self.inflight[url])
+            except Exception:
+                pass
+
+        entry = self.entries.get(url)
+        etag = None
+        if entry and not os.path.exists(entry.file_path):
+            self._drop(entry)
+            entry = None
+        if entry:
+            if time.time() - entry.created <= self.ttl:
+                self.hits += 1
+                return self._use(entry, supported_formats)
+            if entry.etag:
+                etag = entry.etag
+            else:
+                self._drop(entry)
+                entry = None
+
+        future = asyncio.get_event_loop().create_future()
+        self.inflight[url] = future
+        try:
+            (file_path, mime, etag) = await self.bot.utils.download_url_info(
+                url, supported_formats, skip_head=skip_head or bool(entry), etag=etag)
+            if not file_path:
+                self.revalidated += 1
+                entry.created = time.time()
+            else:
+                self.misses += 1
+                if entry:
+                    self._drop(entry)
+                entry = InputCacheEntry(url, file_path, mime, etag)
+                self.downloaded += entry.size
+                self.entries[url] = entry
+                self.paths[file_path] = entry
+            file_path = self._use(entry, supported_formats)
+            self.evict()
+            return file_path
+        finally:
+            del self.inflight[url]
+            future.set_result(None)
+
+    def _use(self, entry, supported_formats):
+        if supported_formats and not entry.mime in supported_formats:
+            raise DownloadURLError('badformat', mime=entry.mime)
+        entry.refs += 1
+        self.entries.move_to_end(entry.url)
+        return entry.file_path
+
+    def release(self, file_path):
+        """Gives back a file path from fetch(), deleting the file if it was evicted and is unused."""
+        entry = self.paths.get(file_path)
+        if not entry:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            media_info.remove_sidecar(file_path)
+            return
+        entry.refs -= 1
+        if entry.evicted and entry.refs <= 0:
+            self._remove_file(entry)
+
+    def _drop(self, entry):
+        if self.entries.get(entry.url) is entry:
+            del self.entries[entry.url]
+        entry.evicted = True
+        if entry.refs <= 0:
+            self._remove_file(entry)
+
+    def _remove_file(self, entry):
+        self.paths.pop(entry.file_path, None)
+        if os.path.exists(entry.file_path):
+            os.remove(entry.file_path)
+        media_info.remove_sidecar(entry.file_path)
+
+    def evict(self):
+        """Drops the least recently used unused files until the cache fits its size cap."""
+        total = sum(entry.size for entry in self.entries.values())
+        for entry in list(self.entries.values()):
+            if total <= self.max_size:
+                break
+            if entry.refs > 0:
+                continue
+            self._drop(entry)
+            total -= entry.size
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'size': sum(entry.size for entry in self.entries.values()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidated': self.revalidated,
+            'coalesced': self.coalesced,
+            'downloaded': self.downloaded
+        }
+
+def setup(bot):
+    bot.input_cache = InputCache(bot)
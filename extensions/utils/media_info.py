@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+# videobox media info util
+# Probes media files once and remembers what they contain.
+
+'''Media Info File'''
+
+import os
+import json
+import asyncio
+import ffmpeg
+from collections import OrderedDict
+
+class MediaInfo():
+    """Information about a media file from ffprobe."""
+
+    def __init__(self, probe):
+        self.probe = probe
+        self.streams = probe.get('streams', [])
+        self.format = probe.get('format', {})
+        self.video_stream = next((stream for stream in self.streams if stream['codec_type'] == 'video'), None)
+        self.audio_stream = next((stream for stream in self.streams if stream['codec_type'] == 'audio'), None)
+
+        duration = self.format.get('duration') or (self.video_stream or {}).get('duration') or 0
+        self.duration = float(duration)
+        self.size = int(self.format.get('size') or 0)
+        self.width = int(self.video_stream['width']) if self.video_stream else None
+        self.height = int(self.video_stream['height']) if self.video_stream else None
+        self.video_codec = self.video_stream['codec_name'] if self.video_stream else None
+        self.audio_codec = self.audio_stream['codec_name'] if self.audio_stream else None
+
+        self.fps = None
+        if self.video_stream:
+            (num, den) = self.video_stream.get('avg_frame_rate', '0/0').split('/')
+            if int(num) and int(den):
+                self.fps = int(num) / int(den)
+
+    @property
+    def has_video(self):
+        return self.video_stream is not None
+
+    @property
+    def has_audio(self):
+        return self.audio_stream is not None
+
+    def __repr__(self):
+        attrs = [
+            ('duration', self.duration),
+            ('width', self.width),
+            ('height', self.height),
+            ('video_codec', self.video_codec),
+            ('audio_codec', self.audio_codec),
+        ]
+        return '<%s %s>' % (self.__class__.__name__, ' '.join('%s=%r' % t for t in attrs))
+
+# Probes of recently used files, bounded since render workers live long and never release files
+MAX_PROBES = 256
+_probes = OrderedDict()
+
+def _stat_key(file_path):
+    stat = os.stat(file_path)
+    return [stat.st_mtime, stat.st_size]
+
+def _sidecar_path(file_path):
+    return f'{file_path}.probe.json'
+
+def _read_sidecar(file_path, stat_key):
+    try:
+        with open(_sidecar_path(file_path)) as f:
+            sidecar = json.load(f)
+        if sidecar['stat'] == stat_key:
+            return sidecar['probe']
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+    return None
+
+def _write_sidecar(file_path, stat_key, probe):
+    with open(_sidecar_path(file_path), 'w') as f:
+        json.dump({'stat': stat_key, 'probe': probe}, f)
+
+def _remember(file_path, stat_key, probe):
+    _probes[file_path] = (stat_key, probe)
+    _probes.move_to_end(file_path)
+    while len(_probes) > MAX_PROBES:
+        _probes.popitem(last=False)
+    return MediaInfo(probe)
+
+def _recall(file_path, stat_key):
+    """Gets a remembered probe of a file if it hasn't changed since."""
+    cached = _probes.get(file_path)
+    if not cached or cached[0] != stat_key:
+        return None
+    _probes.move_to_end(file_path)
+    return cached[1]
+
+def probe_file(file_path, sidecar=False):
+    """Probes a file, reusing earlier probes of it. Blocks, so only use this outside of the event loop.
+    Sidecars are only shared for files in the bot's cache, so they never end up next to a user's files."""
+    stat_key = _stat_key(file_path)
+    cached = _recall(file_path, stat_key)
+    if cached is not None:
+        return MediaInfo(cached)
+
+    probe = _read_sidecar(file_path, stat_key) if sidecar else None
+    if probe is None:
+        probe = ffmpeg.probe(file_path)
+        if sidecar:
+            _write_sidecar(file_path, stat_key, probe)
+    return _remember(file_path, stat_key, probe)
+
+def remove_sidecar(file_path):
+    _probes.pop(file_path, None)
+    if os.path.exists(_sidecar_path(file_path)):
+        os.remove(_sidecar_path(file_path))
+
+class MediaProbe():
+    """Probes files with ffprobe without blocking the event loop."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.probes = 0
+        self.hits = 0
+
+    async def probe(self, file_path):
+        """Probes a file once, caching the result next to it for every other cog and render worker."""
+        stat_key = _stat_key(file_path)
+        cached = _recall(file_path, stat_key)
+        if cached is not None:
+            self.hits += 1
+            return MediaInfo(cached)
+        probe = _read_sidecar(file_path, stat_key)
+        if probe is not None:
+            self.hits += 1
+            return _remember(file_path, stat_key, probe)
+
+        self.probes += 1
+        process = await asyncio.create_subprocess_exec(
+            'ffprobe', '-show_format', '-show_streams', '-of', 'json', file_path,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        (out, err) = await process.communicate()
+        if process.returncode != 0:
+            raise ffmpeg.Error('ffprobe', out, err)
+        probe = json.loads(out.decode('utf-8'))
+        _write_sidecar(file_path, stat_key, probe)
+        return _remember(file_path, stat_key, probe)
+
+def setup(bot):
+    bot.media_probe = MediaProbe(bot)
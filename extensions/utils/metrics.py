@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+# videobox metrics util
+# Serves Prometheus metrics about the bot over HTTP.
+
+'''Metrics File'''
+
+import time
+from aiohttp import web
+
+class Histogram():
+    """A cumulative histogram in the Prometheus style."""
+
+    BUCKETS = [0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120]
+
+    def __init__(self, buckets=None):
+        self.buckets = buckets or self.BUCKETS
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for (i, bucket) in enumerate(self.buckets):
+            if value <= bucket:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+class Metrics():
+    """Collects metrics from the bot's utils and serves them on a local HTTP endpoint."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.host = bot.config.get('metrics_host', '127.0.0.1')
+        self.port = bot.config.get('metrics_port')
+        self.latency = {}
+        self.errors = {}
+        self.runner = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/metrics', self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        print(f'Serving metrics on http://{self.host}:{self.port}/metrics')
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def on_command(self, ctx):
+        ctx.metrics_start = time.perf_counter()
+
+    async def on_command_completion(self, ctx):
+        self._observe(ctx)
+
+    async def on_command_error(self, ctx, error):
+        if ctx.command:
+            name = ctx.command.qualified_name
+            self.errors[name] = self.errors.get(name, 0) + 1
+        self._observe(ctx)
+
+    def _observe(self, ctx):
+        if not ctx.command or not hasattr(ctx, 'metrics_start'):
+            return
+        name = ctx.command.qualified_name
+        if name not in self.latency:
+            self.latency[name] = Histogram()
+        self.latency[name].observe(time.perf_counter() - ctx.metrics_start)
+
+    async def handle(self, request):
+        return web.Response(text=self.render(), content_type='text/plain', charset='utf-8')
+
+    def render(self):
+        """Renders every metric in the Prometheus text format."""
+        lines = []
+
+        def metric(name, kind, description, samples):
+            lines.append(f'# HELP videobox_{name} {description}')
+            lines.append(f'# TYPE videobox_{name} {kind}')
+            for sample in samples:
+                # Samples can have a suffix, like the _bucket, _sum and _count of histograms
+                (suffix, labels, value) = sample if len(sample) == 3 else ('',) + sample
+                label_text = ','.join(f'{key}="{label}"' for (key, label) in labels.items())
+                lines.append(f'videobox_{name}{suffix}{{{label_text}}} {value}' if labels else f'videobox_{name}{suffix} {value}')
+
+        render_queue = getattr(self.bot, 'render_queue', None)
+        if render_queue:
+            stats = render_queue.stats()
+            metric('render_queue_depth', 'gauge', 'Renders waiting for a slot.', [({}, stats['queued'])])
+            metric('render_queue_running', 'gauge', 'Renders holding a slot.', [({}, stats['running'])])
+            metric('render_queue_backlog', 'gauge', 'Most renders that can wait for a slot.', [({}, stats['backlog'])])
+
+        render_pool = getattr(self.bot, 'render_pool', None)
+        if render_pool:
+            stats = render_pool.stats()
+            for key in ['size', 'active', 'queued']:
+                metric(f'workers_{key}', 'gauge', f'Workers {key} in each pool.',
+                    [({'pool': pool}, values[key]) for (pool, values) in stats.items()])
+
+        samples = []
+        for (command, histogram) in self.latency.items():
+            for (bucket, count) in zip(histogram.buckets, histogram.counts):
+                samples.append(('_bucket', {'command': command, 'le': bucket}, count))
+            samples.append(('_bucket', {'command': command, 'le': '+Inf'}, histogram.count))
+            samples.append(('_sum', {'command': command}, histogram.sum))
+            samples.append(('_count', {'command': command}, histogram.count))
+        metric('command_latency_seconds', 'histogram', 'Time taken by commands.', samples)
+        metric('command_errors_total', 'counter', 'Commands that raised an error.',
+            [({'command': command}, count) for (command, count) in self.errors.items()])
+
+        for (cache, description) in [
+            ('input_cache', 'downloaded media'),
+            ('result_cache', 'rendered videos'),
+            ('url_cache', 'resolved links')
+        ]:
+            util = getattr(self.bot, cache, None)
+            if not util:
+                continue
+            total = util.hits + util.misses
+            metric(f'{cache}_hits_total', 'counter', f'Cache hits of {description}.', [({}, util.hits)])
+            metric(f'{cache}_misses_total', 'counter', f'Cache misses of {description}.', [({}, util.misses)])
+            metric(f'{cache}_hit_ratio', 'gauge', f'Cache hit ratio of {description}.',
+                [({}, util.hits / total if total else 0)])
+
+        input_cache = getattr(self.bot, 'input_cache', None)
+        if input_cache:
+            metric('download_bytes_total', 'counter', 'Bytes of media downloaded.', [({}, input_cache.downloaded)])
+
+        samples = []
+        for kind in ['video_extractor', 'photo_extractor']:
+            extractor = getattr(self.bot, kind, None)
+            if extractor:
+                samples.extend(({'extractor': name}, stats['errors']) for (name, stats) in extractor.stats.items())
+        metric('extractor_errors_total', 'counter', 'Errors raised by each extractor.', samples)
+
+        uploader = getattr(self.bot, 'uploader', None)
+        if uploader:
+            stats = uploader.stats()
+            metric('uploads_total', 'counter', 'Renders uploaded.', [({}, stats['uploads'])])
+            metric('upload_bytes_total', 'counter', 'Bytes of renders uploaded.', [({}, stats['bytes'])])
+            metric('upload_seconds_total', 'counter', 'Time spent sending uploads.', [({}, stats['seconds'])])
+            metric('upload_throughput_bytes', 'gauge', 'Average upload throughput in bytes per second.', [({}, stats['throughput'])])
+            metric('upload_retries_total', 'counter', 'Upload attempts that were retried.', [({}, stats['retried'])])
+            metric('upload_failures_total', 'counter', 'Uploads that failed after retrying.', [({}, stats['failures'])])
+
+        metric('gateway_latency_seconds', 'gauge', 'Heartbeat latency of each shard.',
+            [({'shard': shard}, latency) for (shard, latency) in self.bot.latencies])
+
+        return '\n'.join(lines) + '\n'
+
+def setup(bot):
+    bot.metrics = Metrics(bot)
+    if not bot.metrics.port:
+        return
+    for event in ['on_command', 'on_command_completion', 'on_command_error']:
+        bot.add_listener(getattr(bot.metrics, event), event)
+    bot.loop.create_task(bot.metrics.start())
+
+def teardown(bot):
+    for event in ['on_command', 'on_command_completion', 'on_command_error']:
+        bot.remove_listener(getattr(bot.metrics, event), event)
+    bot.loop.create_task(bot.metrics.stop())
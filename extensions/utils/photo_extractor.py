@@ -7,67 +7,25 @@
 
 import re
 import json
-import base64
 from bs4 import BeautifulSoup
-from discord.ext import commands
-from .utils import TwitterAuthException
+from .extractor import Extractor
 
-class PhotoExtractor():
+class PhotoExtractor(Extractor):
     """Provides a way to get photo URLs from various URLs."""
 
     def __init__(self, bot):
-        self.bot = bot
-        self.request = bot.request
-        self.fake_user_agent = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_12_6) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/79.0.3924.0 Safari/537.36'
-
-        self.extractors = [
-            'extract_vine',
-            'extract_twitch_clip',
-            'extract_twitch_vod',
-            'extract_twitter',
-            'extract_imgur',
-            'extract_instagram'
-        ]
-
-    async def get_url(self, url):
-        """Gets a photo URL from a URL."""
-
-        try:
-            for extractor in self.extractors:
-                result = await getattr(self, extractor)(url)
-                if result != None: return result
-            return None
-        except Exception as e:
-            print(e)
-            return None
-
-    def _to_json(self, obj):
-        return json.dumps(obj, separators=(',', ':'), ensure_ascii=True)
-
-    async def _refresh_twitter(self):
-        creds = self.bot.config['twitter']
-        auth = base64.b64encode(f"{creds['consumer']}:{creds['secret']}".encode('ascii')).decode("utf-8")
-
-        async with self.request.post(
-            url = "https://api.twitter.com/oauth2/token",
-            headers = {
-                'Authorization': f"Basic {auth}",
-                'Content-Type': "application/x-www-form-urlencoded"
-            },
-            data = 'grant_type=client_credentials'
-        ) as response:
-            if response.status == 403:
-                raise TwitterAuthException(response)
-            self.bot._twitter_token = (await response.json())['access_token']
-            response.close()
-
-    async def extract_vine(self, url):
+        super().__init__(bot, 'photo', [
+            ('extract_vine', ['vine.co'], r"^https?://(?:www\.)?vine\.co/(?:v|oembed)/(\w+)"),
+            ('extract_twitch_clip', ['clips.twitch.tv', 'twitch.tv'], r"^https?://(?:clips\.twitch\.tv/(?:embed\?.*?\bclip=|(?:[^/]+/)*)|(?:www\.)?twitch\.tv\/[^/]+/clip/)([a-zA-Z]+)"),
+            ('extract_twitch_vod', ['twitch.tv'], r"^https?://(?:www\.)?twitch\.tv/videos/(\d+)"),
+            ('extract_twitter', ['twitter.com'], r"^https?://twitter\.com/\w+/status/(\d{17,19})(?:/(?:video/(\d))?)?"),
+            ('extract_imgur', ['imgur.com', 'i.imgur.com'], r"^https?://(?:i\.)?imgur\.com/(?!(?:a|gallery|(?:t(?:opic)?|r)/[^/]+)/)([a-zA-Z0-9]+)"),
+            ('extract_instagram', ['instagram.com'], r"^https?://(?:www\.)?instagram\.com/(?:p|tv)/(\w+)")
+        ])
+
+    async def extract_vine(self, url, match):
         """Get the photo link to a Vine URL."""
 
-        regex = r"^https?://(?:www\.)?vine\.co/(?:v|oembed)/(\w+)"
-        match = re.match(regex, url)
-        if(not match): return None
-
         async with self.request.get(
             url = f"https://archive.vine.co/posts/{match.groups()[0]}.json"
         ) as response:
@@ -78,13 +36,9 @@ class PhotoExtractor():
             response.close()
             return photo_url
     
-    async def extract_twitch_clip(self, url):
+    async def extract_twitch_clip(self, url, match):
         """Get the photo link to a Twitch Clip URL."""
 
-        regex = r"^https?://(?:clips\.twitch\.tv/(?:embed\?.*?\bclip=|(?:[^/]+/)*)|(?:www\.)?twitch\.tv\/[^/]+/clip/)([a-zA-Z]+)"
-        match = re.match(regex, url)
-        if(not match): return None
-
         payload = [{
             'operationName': 'incrementClipViewCount',
             'variables': { 'input': { 'slug': match.groups()[0] } },
@@ -109,13 +63,9 @@ class PhotoExtractor():
             if clip['data']['updateClipViewCount'] == None: return None
             return f"https://clips-media-assets2.twitch.tv/AT-cm%7C{clip['data']['updateClipViewCount']['clip']['id']}-preview-480x272.jpg"
 
-    async def extract_twitch_vod(self, url):
+    async def extract_twitch_vod(self, url, match):
         """Get the photo link to a Twitch VOD."""
 
-        regex = r"^https?://(?:www\.)?twitch\.tv/videos/(\d+)"
-        match = re.match(regex, url)
-        if(not match): return None
-
         async with self.request.get(
             url = f"https://api.twitch.tv/helix/videos?id={match.groups()[0]}",
             headers = {
@@ -130,12 +80,9 @@ class PhotoExtractor():
             response.close()
             return clip['data'][0]['thumbnail_url'].replace('%{width}', '1430').replace('%{height}', '800')
 
-    async def extract_twitter(self, url):
+    async def extract_twitter(self, url, match):
         """Get the photo link to a Twitter URL."""
 
-        regex = r"^https?://twitter\.com/\w+/status/(\d{17,19})(?:/(?:video/(\d))?)?"
-        match = re.match(regex, url)
-        if(not match): return None
         if(not self.bot.config['twitter']): return None
         if(not self.bot.config['twitter']['secret'] or
             not self.bot.config['twitter']['consumer']): return None
@@ -153,7 +100,7 @@ class PhotoExtractor():
             elif response.status == 403:
                 response.close()
                 await self._refresh_twitter()
-                return await self.extract_twitter(url)
+                return await self.extract_twitter(url, match)
             data = await response.json()
             response.close()
             if data['extended_entities'] and data['extended_entities']['media'] and len(data['extended_entities']['media']) > 0:
@@ -167,20 +114,14 @@ class PhotoExtractor():
 
                 return data['extended_entities']['media'][mediaID]['media_url_https']
 
-    async def extract_imgur(self, url):
+    async def extract_imgur(self, url, match):
         """Get the photo link to an Imgur URL."""
 
-        regex = r"^https?://(?:i\.)?imgur\.com/(?!(?:a|gallery|(?:t(?:opic)?|r)/[^/]+)/)([a-zA-Z0-9]+)"
-        match = re.match(regex, url)
-        if(not match): return None
         return f"https://i.imgur.com/{match.groups()[0]}.png"
 
-    async def extract_instagram(self, url):
+    async def extract_instagram(self, url, match):
         """Get the photo link to an Instagram URL."""
 
-        regex = r"^https?://(?:www\.)?instagram\.com/(?:p|tv)/(\w+)"
-        match = re.match(regex, url)
-        if(not match): return None
         async with self.request.get(url=url) as response:
             html = await response.text()
             response.close()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+# videobox render pool util
+# Provides shared executors for rendering and blocking I/O.
+
+'''Render Pool File'''
+
+import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from . import render_worker
+from .renderer import RenderResult
+
+class RenderPool():
+    """Provides bounded, shared executors for rendering and blocking I/O."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.sizes = {
+            'render': bot.config.get('render_workers') or max(1, (os.cpu_count() or 1) // 2),
+            'io': bot.config.get('io_workers') or 4
+        }
+        self.pools = {
+            name: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f'videobox-{name}')
+            for name, size in self.sizes.items()
+        }
+        # Renders in separate processes keep frame compositing from holding the GIL of the gateway
+        self.processes = bot.config.get('render_processes') or 0
+        self.process_pool = ProcessPoolExecutor(max_workers=self.processes) if self.processes else None
+        self.process_inflight = 0
+        self.queued = {name: 0 for name in self.pools}
+        self.active = {name: 0 for name in self.pools}
+        self.completed = {name: 0 for name in self.pools}
+        self._lock = threading.Lock()
+
+    def _track(self, pool, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self._lock:
+                self.queued[pool] -= 1
+                self.active[pool] += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.active[pool] -= 1
+                    self.completed[pool] += 1
+        return wrapper
+
+    def submit(self, pool, fn, *args, **kwargs):
+        """Submits a sync function to a pool and returns an awaitable future."""
+        if pool not in self.pools:
+            raise KeyError(f'Unknown pool: {pool}')
+        with self._lock:
+            self.queued[pool] += 1
+        try:
+            future = self.pools[pool].submit(self._track(pool, fn), *args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.queued[pool] -= 1
+            raise
+        return asyncio.wrap_future(future)
+
+    async def run_job(self, job):
+        """Runs a render job through the render broker if there is one, otherwise in the
+        process pool, or the render pool if processes are disabled."""
+        broker = getattr(self.bot, 'render_broker', None)
+        if broker:
+            return await broker.run_job(job)
+        if not self.process_pool:
+            return RenderResult(*await self.submit('render', render_worker.run_job, job))
+
+        self.process_inflight += 1
+        try:
+            for attempt in range(2):
+                pool = self.process_pool
+                try:
+                    (output, trace) = await asyncio.wrap_future(pool.submit(render_worker.run_job, job))
+                    break
+                except BrokenProcessPool:
+                    # A render process that dies (like from running out of memory) breaks the pool
+                    # for every job in it, so the pool is replaced and its jobs get one more try
+                    self._replace_process_pool(pool)
+                    if attempt:
+                        raise
+        finally:
+            self.process_inflight -= 1
+        return RenderResult(output, trace)
+
+    def _replace_process_pool(self, broken):
+        with self._lock:
+            if self.process_pool is not broken:
+                return
+            self.process_pool = ProcessPoolExecutor(max_workers=self.processes)
+        broken.shutdown(wait=False)
+
+    def stats(self):
+        """Returns the size, queue depth and active workers of every pool."""
+        with self._lock:
+            stats = {
+                name: {
+                    'size': self.sizes[name],
+                    'queued': self.queued[name],
+                    'active': self.active[name],
+                    'completed': self.completed[name]
+                } for name in self.pools
+            }
+            if self.process_pool:
+                stats['process'] = {
+                    'size': self.processes,
+                    'queued': max(0, self.process_inflight - self.processes),
+                    'active': min(self.process_inflight, self.processes)
+                }
+            return stats
+
+    def shutdown(self):
+        for pool in self.pools.values():
+            pool.shutdown(wait=False)
+        if self.process_pool:
+            self.process_pool.shutdown(wait=False)
+
+def setup(bot):
+    bot.render_pool = RenderPool(bot)
+
+def teardown(bot):
+    bot.render_pool.shutdown()
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+# videobox render queue util
+# Schedules renders fairly between guilds.
+
+'''Render Queue File'''
+
+import time
+import asyncio
+from collections import OrderedDict, deque
+from discord.ext import commands
+
+class RenderQueueFull(commands.CommandError):
+    """Exception that is thrown when a render can't be admitted into the queue."""
+
+    def __init__(self, retry_after, user_limit=False):
+        self.retry_after = retry_after
+        self.user_limit = user_limit
+        super().__init__(f"Render queue is full, retry in {retry_after:.0f}s")
+
+class RenderTicket():
+    """A render's place in the queue."""
+
+    def __init__(self, key, user_id):
+        self.key = key
+        self.user_id = user_id
+        self.future = asyncio.get_event_loop().create_future()
+        self.started_at = None
+
+    def __repr__(self):
+        return '<%s key=%r user_id=%r running=%r>' % (
+            self.__class__.__name__, self.key, self.user_id, self.future.done())
+
+class RenderQueue():
+    """A bounded render queue with a global concurrency limit and per-guild round robin."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.concurrency = bot.config.get('render_concurrency') or bot.config.get('render_workers') or 2
+        self.max_backlog = bot.config.get('render_backlog') or 20
+        self.user_limit = bot.config.get('render_user_limit') or 2
+        self.running = 0
+        self.buckets = OrderedDict()
+        self.user_counts = {}
+        self.durations = deque([30.0], maxlen=20)
+
+    @property
+    def depth(self):
+        """The amount of renders waiting for a slot."""
+        return sum(len(bucket) for bucket in self.buckets.values())
+
+    def _key(self, ctx):
+        # Guilds share one bucket, DMs get a bucket per user
+        return f'guild:{ctx.guild.id}' if ctx.guild else f'user:{ctx.author.id}'
+
+    def retry_after(self):
+        """Estimates how long it takes for the backlog to clear."""
+        average = sum(self.durations) / len(self.durations)
+        return average * (self.depth + 1) / self.concurrency
+
+    def check(self, ctx):
+        """Raises RenderQueueFull if the context can't queue another render."""
+        if self.depth >= self.max_backlog:
+            raise RenderQueueFull(self.retry_after())
+        if self.user_counts.get(ctx.author.id, 0) >= self.user_limit:
+            raise RenderQueueFull(self.retry_after(), user_limit=True)
+
+    def enqueue(self, ctx):
+        """Queues a render and returns its ticket."""
+        self.check(ctx)
+        ticket = RenderTicket(self._key(ctx), ctx.author.id)
+        self.buckets.setdefault(ticket.key, deque()).append(ticket)
+        self.user_counts[ticket.user_id] = self.user_counts.get(ticket.user_id, 0) + 1
+        self._dispatch()
+        return ticket
+
+    def position(self, ticket):
+        """Gets the 1-based position of a waiting ticket, following round robin order."""
+        if ticket.future.done():
+            return 0
+        buckets = list(self.buckets.values())
+        position = 0
+        for index in range(max(len(bucket) for bucket in buckets)):
+            for bucket in buckets:
+                if index < len(bucket):
+                    position += 1
+                    if bucket[index] is ticket:
+                        return position
+        return 0
+
+    def _dispatch(self):
+        while self.running < self.concurrency and self.buckets:
+            key, bucket = next(iter(self.buckets.items()))
+            ticket = bucket.popleft()
+            # Move the guild to the back of the line
+            del self.buckets[key]
+            if bucket:
+                self.buckets[key] = bucket
+            self.running += 1
+            ticket.started_at = time.time()
+            ticket.future.set_result(True)
+
+    def release(self, ticket):
+        """Gives back a ticket, either freeing its slot or leaving the queue."""
+        if ticket.future.done():
+            self.running -= 1
+            self.durations.append(time.time() - ticket.started_at)
+        else:
+            bucket = self.buckets.get(ticket.key)
+            if bucket and ticket in bucket:
+                bucket.remove(ticket)
+                if not bucket:
+                    del self.buckets[ticket.key]
+            ticket.future.cancel()
+        self.user_counts[ticket.user_id] -= 1
+        if not self.user_counts[ticket.user_id]:
+            del self.user_counts[ticket.user_id]
+        self._dispatch()
+
+    async def wait(self, ticket, on_position=None, interval=3):
+        """Waits for a ticket to get a slot, reporting position changes to a coroutine function."""
+        last_position = None
+        while not ticket.future.done():
+            position = self.position(ticket)
+            if on_position and position != last_position:
+                last_position = position
+                await on_position(position)
+            try:
+                await asyncio.wait_for(asyncio.shield(ticket.future), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+        if on_position and last_position:
+            await on_position(0)
+
+    def slot(self, ctx, on_position=None):
+        """Returns an async context manager that holds a render slot."""
+        return RenderSlot(self, ctx, on_position)
+
+    def stats(self):
+        return {
+            'running': self.running,
+            'queued': self.depth,
+            'concurrency': self.concurrency,
+            'backlog': self.max_backlog
+        }
+
+class RenderSlot():
+    """Async context manager for holding a render slot."""
+
+    def __init__(self, queue, ctx, on_position=None):
+        self.queue = queue
+        self.ctx = ctx
+        self.on_position = on_position
+        self.ticket = None
+
+    async def __aenter__(self):
+        self.ticket = self.queue.enqueue(self.ctx)
+        try:
+            await self.queue.wait(self.ticket, self.on_position)
+        except BaseException:
+            self.queue.release(self.ticket)
+            raise
+        return self.ticket
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.queue.release(self.ticket)
+
+def setup(bot):
+    bot.render_queue = RenderQueue(bot)
@@ -0,0 +1,574 @@
+# -*- coding: utf-8 -*-
+
+# videobox render worker util
+# Renders videos from serializable job descriptions.
+
+'''Render Worker File'''
+
+import os
+import glob
+import math
+import ffmpeg
+from moviepy.editor import VideoFileClip, TextClip, ImageClip, CompositeVideoClip, ColorClip, AudioFileClip, concatenate_videoclips
+import moviepy.video.fx.all as vfx
+from . import template_cache
+from . import media_info
+from . import encoding
+from . import telemetry
+
+ASSETS = {
+    'crabrave': {
+        'video': 'assets/crabrave.mp4'
+    },
+    'theboys': {
+        'video': 'assets/theboys.mp4'
+    },
+    'tobecontinued': {
+        'start_sound': 'assets/tobecontinued/roundabout_start.mp3',
+        'sound': 'assets/tobecontinued/roundabout.mp3',
+        'arrow': 'assets/tobecontinued/arrow.png'
+    },
+    'wellberightback': {
+        'sound': 'assets/wellberightback/sound.mp3',
+        'text': 'assets/wellberightback/text.png'
+    },
+    'fnafjumpscare': {
+        'sound': 'assets/fnafjumpscare/sound.mp3',
+        'gif': 'assets/fnafjumpscare/scare.gif'
+    },
+    'discordvid2': {
+        'font': 'assets/discordvid2/DejaVuSans.ttf',
+        'bold_font': 'assets/discordvid2/DejaVuSans-Bold.ttf',
+        'ticker_font': 'assets/discordvid2/Topaz.ttf',
+        'outro': 'assets/discordvid2/outro.mp4'
+    }
+}
+
+PIPELINES = {}
+STREAMS = {}
+
+class RenderJob():
+    """A serializable description of a render that can be sent to another process."""
+
+    def __init__(self, command, output, inputs=None, text=None, assets=None, options=None):
+        self.command = command
+        self.output = output
+        self.inputs = inputs or []
+        self.text = text or []
+        self.assets = assets or ASSETS.get(command, {})
+        self.options = options or {}
+
+    def __repr__(self):
+        attrs = [
+            ('command', self.command),
+            ('inputs', self.inputs),
+            ('text', self.text),
+            ('output', self.output),
+        ]
+        return '<%s %s>' % (self.__class__.__name__, ' '.join('%s=%r' % t for t in attrs))
+
+def pipeline(command, backend='moviepy'):
+    """Registers a function as the pipeline for a command using a backend."""
+    def decorator(fn):
+        PIPELINES[(command, backend)] = fn
+        return fn
+    return decorator
+
+def streams(command):
+    """Registers a function that gets the FFmpeg streams, duration and output arguments
+    of a command, so it can be rendered to a pipe."""
+    def decorator(fn):
+        STREAMS[command] = fn
+        return fn
+    return decorator
+
+def run_job(job):
+    """Runs a render job and returns the path of the output file with a trace of its stages."""
+    backend = job.options.get('backend', 'moviepy')
+    # Commands without a pipeline for the backend fall back to MoviePy, or FFmpeg if they only have that
+    if (job.command, backend) not in PIPELINES:
+        backend = 'moviepy' if (job.command, 'moviepy') in PIPELINES else 'ffmpeg'
+    if (job.command, backend) not in PIPELINES:
+        raise KeyError(f'No pipeline for command: {job.command}')
+    job.trace = telemetry.Trace(job.command)
+    try:
+        with telemetry.PeakRSS() as memory:
+            output = PIPELINES[(job.command, backend)](job)
+    finally:
+        if os.path.exists(_normalized_path(job)):
+            os.remove(_normalized_path(job))
+    job.trace.sizes['output'] = os.path.getsize(output)
+    job.trace.peak_rss = memory.peak
+    return output, job.trace
+
+def _templates(job):
+    settings = job.options.get('template_cache')
+    if not settings:
+        return None
+    return template_cache.get_cache(settings['path'], settings['max_size'])
+
+def _pcm_audio(job, name):
+    """Gets an audio asset decoded to PCM, so the MP3 isn't decoded again on every render."""
+    templates = _templates(job)
+    if not templates:
+        return job.assets[name]
+
+    def build(path):
+        ffmpeg.input(job.assets[name]).output(path, acodec='pcm_s16le').run(quiet=True, overwrite_output=True)
+    return templates.get('pcm', [job.assets[name]], {}, build, 'wav')
+
+def _masked_jumpscare(job):
+    """Gets the jumpscare gif at 720p with its white background keyed out into an alpha channel."""
+    templates = _templates(job)
+    if not templates:
+        return None
+
+    def build(path):
+        (
+            ffmpeg.input(job.assets['gif']).video
+            .filter('scale', w=1280, h=720)
+            .filter('colorkey', color='white', similarity=0.01)
+            .output(path, vcodec='qtrle', pix_fmt='argb')
+            .run(quiet=True, overwrite_output=True)
+        )
+    return templates.get('jumpscare', [job.assets['gif']], {'size': [1280, 720]}, build, 'mov')
+
+def _divider(job):
+    """Gets the crabrave divider rasterized as a PNG."""
+    templates = _templates(job)
+    if not templates:
+        return None
+
+    def build(path):
+        divider = TextClip("____________________", fontsize=48, color='white', font='Verdana')
+        divider.save_frame(path)
+        divider.close()
+    return templates.get('divider', [], {'text': '____________________', 'fontsize': 48, 'font': 'Verdana'}, build, 'png')
+
+def _bitrate_cap(job, duration):
+    """Gets the video bitrate cap that keeps the job's output under its size limit, if it has one."""
+    size_limit = job.options.get('size_limit')
+    if not size_limit or not duration:
+        return None
+    return encoding.fit_bitrate(job.options.get('profile'), duration, size_limit)
+
+def write_moviepy(job, video, clips=[]):
+    """Exports a MoviePy clip to the job's output and closes every clip."""
+    videoname = job.output
+    bitrate_cap = _bitrate_cap(job, video.duration)
+    args = encoding.moviepy_args(job.options.get('profile'), bitrate_cap)
+    # MoviePy composites frames lazily while encoding, so this only times building the clips
+    job.trace.lap('setup')
+    # MoviePy picks the audio muxer from the file extension, so it has to suit the profile's codec
+    audio_extension = encoding.audio_extension(args['audio_codec'])
+    try:
+        if job.options.get('stitch_mpy_audio') and video.audio:
+            # In the rare case that moviepy doesn't correctly add audio, let FFmpeg do it.
+            # Both streams are copied, so the video is only encoded once.
+            audioname = f'{videoname}.audio.{audio_extension}'
+            silentname = f'{videoname}.silent.mp4'
+            try:
+                with job.trace.stage('encode'):
+                    video.audio.write_audiofile(audioname, codec=args['audio_codec'],
+                        bitrate=args['audio_bitrate'], verbose=False, logger=None)
+                    video.write_videofile(silentname, verbose=False, logger=None, audio=False, **args)
+                with job.trace.stage('mux'):
+                    ffmpeg.output(ffmpeg.input(silentname).video, ffmpeg.input(audioname).audio,
+                        videoname, c='copy').run(quiet=True, overwrite_output=True)
+            finally:
+                for path in [audioname, silentname]:
+                    if os.path.exists(path):
+                        os.remove(path)
+        else:
+            # MoviePy muxes its temporary audio in the same FFmpeg process that encodes the video
+            with job.trace.stage('encode'):
+                video.write_videofile(videoname, verbose=False, logger=None, audio=True,
+                    temp_audiofile=f'{videoname}.temp-audio.{audio_extension}', **args)
+    finally:
+        for clip in clips:
+            clip.close()
+        video.close()
+    return videoname
+
+def ffmpeg_args(job, duration, **kwargs):
+    """Gets the FFmpeg output arguments of a job's profile with the given arguments, keeping
+    the output under the job's size limit. Returns the arguments and the bitrate cap."""
+    bitrate_cap = _bitrate_cap(job, duration)
+    args = dict(encoding.ffmpeg_args(job.options.get('profile'), bitrate_cap), **kwargs)
+    if bitrate_cap and args.get('video_bitrate'):
+        # Commands can ask for a lower bitrate than the cap on purpose
+        args['video_bitrate'] = encoding.lowest_bitrate(args['video_bitrate'], bitrate_cap)
+    return args, bitrate_cap
+
+def write_ffmpeg(job, streams, duration, **kwargs):
+    """Encodes FFmpeg streams to the job's output, keeping it under the job's size limit."""
+    (args, bitrate_cap) = ffmpeg_args(job, duration, **kwargs)
+    job.trace.lap('setup')
+    if not bitrate_cap or job.options.get('size_target') != 'twopass':
+        with job.trace.stage('encode'):
+            ffmpeg.output(*streams, job.output, **args).run(quiet=True, overwrite_output=True)
+        return job.output
+
+    # The first pass only analyzes the video so the second can spend the bitrate where it's needed
+    passlog = f'{job.output}.passlog'
+    args.pop('crf', None)
+    args.update(video_bitrate=args.get('video_bitrate') or bitrate_cap, passlogfile=passlog)
+    try:
+        with job.trace.stage('encode'):
+            ffmpeg.output(*streams, os.devnull, f='null', **dict(args, **{'pass': 1}))\
+                .run(quiet=True, overwrite_output=True)
+            ffmpeg.output(*streams, job.output, **dict(args, **{'pass': 2}))\
+                .run(quiet=True, overwrite_output=True)
+    finally:
+        for log in glob.glob(f'{glob.escape(passlog)}*'):
+            os.remove(log)
+    return job.output
+
+@pipeline('crabrave')
+def render_crabrave(job):
+    (top_text, bottom_text) = job.text
+
+    clip = VideoFileClip(job.assets['video'])
+    text = TextClip(top_text, fontsize=48, color='white', font='Symbola')\
+        .set_position(("center", 200)).set_duration(15.4)
+    divider = _divider(job)
+    text2 = (ImageClip(divider) if divider else TextClip("____________________", fontsize=48, color='white', font='Verdana'))\
+        .set_position(("center", 210)).set_duration(15.4)
+    text3 = TextClip(bottom_text, fontsize=48, color='white', font='Verdana')\
+        .set_position(("center", 270)).set_duration(15.4)
+
+    video = CompositeVideoClip([clip, text.crossfadein(1), text2.crossfadein(1), text3.crossfadein(1)]).set_duration(15.4)
+    return write_moviepy(job, video, [text, text2, text3, clip])
+
+@pipeline('crabrave', backend='ffmpeg')
+def render_crabrave_ffmpeg(job):
+    (top_text, bottom_text) = job.text
+
+    inputstream = ffmpeg.input(job.assets['video'])
+    video = inputstream.video
+    for (text, font, y) in [
+        (top_text, 'Symbola', 200),
+        ("____________________", 'Verdana', 210),
+        (bottom_text, 'Verdana', 270)
+    ]:
+        video = video.filter('drawtext',
+            font=font,
+            text=text,
+            expansion='none',
+            fontcolor='white',
+            fontsize=48,
+            x='(w-text_w)/2',
+            y=y,
+            alpha='min(t,1)'
+        )
+
+    return write_ffmpeg(job, [video, inputstream.audio], 15.4, t=15.4)
+
+@pipeline('theboys')
+def render_theboys(job):
+    clip = VideoFileClip(job.assets['video'])
+    picture = ImageClip(job.inputs[0], duration=clip.duration)\
+        .fx(vfx.resize, newsize=[893, 288])\
+        .set_pos( lambda t: (192, 432) )
+    video = CompositeVideoClip([clip, picture])
+    return write_moviepy(job, video, [clip, picture])
+
+def _probe_input(job, file_path):
+    return media_info.probe_file(file_path, sidecar=job.options.get('probe_sidecars', False))
+
+def _normalized_path(job):
+    return f'{job.output}.input.mkv'
+
+def _normalize_input(job, max_duration, width, height):
+    """Gets the job's input cut to a duration and scaled down to fit a size, so effects never
+    decode more of it than the output uses. Inputs that are already small enough are used as is."""
+    file_path = job.inputs[0]
+    if not job.options.get('normalize_inputs', True):
+        return file_path
+    info = _probe_input(job, file_path)
+    too_large = (info.width or 0) > width or (info.height or 0) > height
+    # Inputs without a known duration are always cut, since they could be any length
+    if info.duration and info.duration <= max_duration and not too_large:
+        return file_path
+
+    output = _normalized_path(job)
+    with job.trace.stage('normalize'):
+        inputstream = ffmpeg.input(file_path, t=max_duration)
+        if too_large:
+            video = (
+                inputstream.video
+                .filter('scale', w=width, h=height, force_original_aspect_ratio='decrease')
+                .filter('scale', w='trunc(iw/2)*2', h='trunc(ih/2)*2')
+            )
+            streams = [video, inputstream.audio] if info.has_audio else [video]
+            stream = ffmpeg.output(*streams, output, vcodec='libx264', preset='ultrafast', crf=18, acodec='copy')
+        else:
+            # Cutting is enough, so the streams are copied without decoding them
+            stream = ffmpeg.output(inputstream, output, c='copy')
+        stream.run(quiet=True, overwrite_output=True)
+    return output
+
+def _load_ending_clip(job):
+    clip = VideoFileClip(_normalize_input(job, 10, 1280, 720), target_resolution=[720, 1280])
+    # I WAS going to get the last 10 seconds but nvm
+    if clip.duration > 10:
+        clip = clip.subclip(0, -clip.duration + 10)
+    return clip
+
+def _probe_duration(file_path):
+    return media_info.probe_file(file_path, sidecar=False).duration
+
+def _ending_streams(job, freeze_duration):
+    """Gets the input trimmed to 10 seconds at 720p, and its last frame frozen for the freeze duration."""
+    info = _probe_input(job, job.inputs[0])
+    # Inputs without a known duration are cut to the longest the clip can be
+    duration = min(info.duration, 10) if info.duration else 10
+    safe_duration = max(0, duration - 0.1)
+    fps = info.fps or 30
+
+    inputstream = ffmpeg.input(job.inputs[0], t=duration)
+    video = (
+        inputstream.video
+        .filter('scale', w=1280, h=720)
+        .filter('setsar', sar=1)
+        .filter('fps', fps=fps)
+    )
+    if info.has_audio:
+        audio = inputstream.audio.filter('apad').filter('atrim', duration=duration)
+    else:
+        audio = ffmpeg.input('anullsrc', f='lavfi', t=duration).audio
+
+    # Freeze fram stuff
+    freeze_frame = (
+        ffmpeg.input(job.inputs[0], ss=safe_duration).video
+        .filter('trim', end_frame=1)
+        .filter('scale', w=1280, h=720)
+        .filter('setsar', sar=1)
+        .filter('tpad', stop_mode='clone', stop_duration=freeze_duration)
+        .filter('fps', fps=fps)
+        .filter('trim', duration=freeze_duration)
+        .filter('setpts', 'PTS-STARTPTS')
+    )
+    return video, audio, freeze_frame, duration
+
+def _write_ending(job, video, audio, freeze_compos, freeze_audio, duration):
+    final = ffmpeg.concat(video, audio, freeze_compos, freeze_audio, v=1, a=1).node
+    return write_ffmpeg(job, [final[0], final[1]], duration)
+
+@pipeline('tobecontinued')
+def render_tobecontinued(job):
+    clip = _load_ending_clip(job)
+    safe_duration = max(0, clip.duration - 0.1)
+
+    # Startup
+    startup_sound = AudioFileClip(_pcm_audio(job, 'start_sound'))
+    startup = ColorClip([1, 1], color=0)\
+        .set_opacity(0)\
+        .set_duration(startup_sound.duration).set_audio(startup_sound)
+    if startup_sound.duration > clip.duration:
+        startup = startup.subclip(startup_sound.duration - clip.duration, startup_sound.duration)
+    else:
+        startup = startup.fx(vfx.freeze, freeze_duration=clip.duration - startup_sound.duration)
+    startup_compos = CompositeVideoClip([clip, startup])
+
+    # Freeze fram stuff
+    freeze_frame_sound = AudioFileClip(_pcm_audio(job, 'sound'))
+    freeze_frame = ImageClip(clip.get_frame(safe_duration))\
+        .fx(vfx.blackwhite).set_duration(freeze_frame_sound.duration)
+    arrow = ImageClip(job.assets['arrow'])\
+        .set_pos( lambda t: (min(529, int((1400*t)-400)), 550) )
+    freeze_compos = CompositeVideoClip([freeze_frame, arrow])\
+        .set_duration(freeze_frame_sound.duration).set_audio(freeze_frame_sound)
+
+    # Final clip
+    video = concatenate_videoclips([startup_compos, freeze_compos])
+    return write_moviepy(job, video, [clip, freeze_frame_sound, freeze_frame, arrow, freeze_compos, startup, startup_sound, startup_compos])
+
+@pipeline('tobecontinued', backend='ffmpeg')
+def render_tobecontinued_ffmpeg(job):
+    start_sound_path = _pcm_audio(job, 'start_sound')
+    sound_path = _pcm_audio(job, 'sound')
+    startup_duration = _probe_duration(start_sound_path)
+    freeze_duration = _probe_duration(sound_path)
+    video, audio, freeze_frame, duration = _ending_streams(job, freeze_duration)
+
+    # Startup, ending right as the clip freezes
+    startup_sound = ffmpeg.input(start_sound_path).audio
+    if startup_duration > duration:
+        startup_sound = startup_sound\
+            .filter('atrim', start=startup_duration - duration)\
+            .filter('asetpts', 'PTS-STARTPTS')
+    else:
+        delay = int((duration - startup_duration) * 1000)
+        startup_sound = startup_sound.filter('adelay', f'{delay}|{delay}')
+    audio = ffmpeg.filter([audio, startup_sound], 'amix', inputs=2, duration='first')\
+        .filter('volume', 2)
+
+    arrow = ffmpeg.input(job.assets['arrow'], loop=1, t=freeze_duration)
+    freeze_compos = (
+        freeze_frame
+        .filter('hue', s=0)
+        .overlay(arrow, x='min(529,1400*t-400)', y=550)
+    )
+    return _write_ending(job, video, audio, freeze_compos, ffmpeg.input(sound_path).audio,
+        duration + freeze_duration)
+
+@pipeline('wellberightback')
+def render_wellberightback(job):
+    clip = _load_ending_clip(job)
+    safe_duration = max(0, clip.duration - 0.1)
+
+    # Freeze fram stuff
+    freeze_frame_sound = AudioFileClip(_pcm_audio(job, 'sound'))
+    freeze_frame = ImageClip(clip.get_frame(safe_duration))\
+        .fx(vfx.painting, black=0.001)\
+        .fx(vfx.colorx, factor=0.8).set_duration(freeze_frame_sound.duration)
+    text = ImageClip(job.assets['text'])\
+        .set_pos( lambda t: (50, 50) )
+    freeze_compos = CompositeVideoClip([freeze_frame, text])\
+        .set_duration(freeze_frame_sound.duration).set_audio(freeze_frame_sound)
+
+    # Final clip
+    video = concatenate_videoclips([clip, freeze_compos])
+    return write_moviepy(job, video, [clip, freeze_frame_sound, freeze_frame, text, freeze_compos])
+
+@pipeline('wellberightback', backend='ffmpeg')
+def render_wellberightback_ffmpeg(job):
+    sound_path = _pcm_audio(job, 'sound')
+    freeze_duration = _probe_duration(sound_path)
+    video, audio, freeze_frame, duration = _ending_streams(job, freeze_duration)
+
+    # Edge color mixing stands in for MoviePy's painting effect
+    text = ffmpeg.input(job.assets['text'], loop=1, t=freeze_duration)
+    freeze_compos = (
+        freeze_frame
+        .filter('edgedetect', mode='colormix', high=0)
+        .filter('colorchannelmixer', rr=0.8, gg=0.8, bb=0.8)
+        .overlay(text, x=50, y=50)
+    )
+    return _write_ending(job, video, audio, freeze_compos, ffmpeg.input(sound_path).audio,
+        duration + freeze_duration)
+
+@pipeline('fnafjumpscare')
+def render_fnafjumpscare(job):
+    clip = _load_ending_clip(job)
+    safe_duration = max(0, clip.duration - 0.1)
+
+    # Freeze fram stuff
+    sound = AudioFileClip(_pcm_audio(job, 'sound'))
+    masked_gif = _masked_jumpscare(job)
+    if masked_gif:
+        gif = VideoFileClip(masked_gif, has_mask=True).set_duration(sound.duration)
+    else:
+        gif = VideoFileClip(job.assets['gif'], target_resolution=[720, 1280])\
+            .fx(vfx.mask_color, color=[255,255,255]).set_duration(sound.duration)
+    freeze_frame = ImageClip(clip.get_frame(safe_duration))\
+        .set_duration(sound.duration)
+    freeze_compos = CompositeVideoClip([freeze_frame, gif])\
+        .set_duration(sound.duration).set_audio(sound)
+
+    # Final clip
+    video = concatenate_videoclips([clip, freeze_compos])
+    return write_moviepy(job, video, [clip, sound, freeze_frame, gif, freeze_compos])
+
+@pipeline('fnafjumpscare', backend='ffmpeg')
+def render_fnafjumpscare_ffmpeg(job):
+    sound_path = _pcm_audio(job, 'sound')
+    freeze_duration = _probe_duration(sound_path)
+    video, audio, freeze_frame, duration = _ending_streams(job, freeze_duration)
+
+    masked_gif = _masked_jumpscare(job)
+    if masked_gif:
+        gif = ffmpeg.input(masked_gif).video
+    else:
+        gif = (
+            ffmpeg.input(job.assets['gif']).video
+            .filter('scale', w=1280, h=720)
+            .filter('colorkey', color='white', similarity=0.01)
+        )
+    freeze_compos = freeze_frame.overlay(gif).filter('trim', duration=freeze_duration)
+    return _write_ending(job, video, audio, freeze_compos, ffmpeg.input(sound_path).audio,
+        duration + freeze_duration)
+
+@streams('discordvid2')
+def discordvid2_streams(job):
+    """Gets the streams, output duration and output arguments of DiscordVid2.
+    The job's text is the bot's tag and the user's tag."""
+    (videobox_at, user_at) = job.text
+    info = _probe_input(job, job.inputs[0])
+    width = info.width
+    height = info.height
+    duration = info.duration
+    # Inputs without a known duration are cut to the longest the clip can be, instead of t=0
+    if duration > 30 or not duration: duration = 30
+
+    font_size = (math.sqrt(math.pow(width, 2) + math.pow(height, 2)) / 1468.6 * 72) * 0.6
+
+    # Only the part of the input that's used gets decoded
+    inputstream = ffmpeg.input(job.inputs[0], t=duration)
+
+    audio = (
+        inputstream.audio
+        .filter('volume', enable=f"between(t,0,{duration}/2)", volume=0.25)
+        .filter('volume', enable=f"between(t,{duration}/2, {duration})", volume=5)
+        .filter('atrim', duration=duration)
+    )
+
+    video = (
+        inputstream.video
+        .filter('scale', h=240, w=320)
+        .filter('frei0r', 'pixeliz0r')
+        .filter('setsar', sar=1)
+        .filter('trim', duration=duration)
+        .filter('drawtext',
+            fontfile=f"'{job.assets['font']}'",
+            text=videobox_at,
+            fontcolor='white',
+            fontsize=font_size,
+            box='1',
+            boxcolor='black@0.5',
+            boxborderw='5',
+            x='(w-text_w)',
+            y='0'
+        ).filter('drawtext',
+            fontfile=f"'{job.assets['font']}'",
+            text=user_at,
+            fontcolor='white',
+            fontsize=font_size,
+            box='1',
+            boxcolor='black@0.5',
+            boxborderw='5',
+            x='0',
+            y='0'
+        ).filter('drawtext',
+            fontfile=f"'{job.assets['bold_font']}'",
+            text=f'Downloaded using {videobox_at}',
+            fontcolor='white',
+            fontsize=font_size,
+            shadowcolor='black',
+            shadowx='2',
+            shadowy='2',
+            x='(w-text_w)/2',
+            y='(h-text_h)/2'
+        ).filter('drawtext',
+            fontfile=f"'{job.assets['ticker_font']}'",
+            text=f'This video was downloaded using {videobox_at}. Reuploads are prohibited via VideoBox guidelines. Visit https://github.com/Snazzah/VideoBox for more information.',
+            fontcolor='white',
+            fontsize=font_size,
+            x='w-mod(max(t-4.5,0)*(w+tw)/7.5,(w+tw))',
+            y='h-line_h-10'
+        )
+    )
+
+    outro = ffmpeg.input(job.assets['outro'])
+    final = ffmpeg.concat(video, audio, outro.video, outro.audio, v=1, a=1).node
+    return [final[0], final[1]], duration + _probe_duration(job.assets['outro']), \
+        {'r': 5, 'ac': 1, 'ar': '8k', 'video_bitrate': '150k'}
+
+@pipeline('discordvid2', backend='ffmpeg')
+def render_discordvid2(job):
+    (streams, duration, args) = discordvid2_streams(job)
+    return write_ffmpeg(job, streams, duration, **args)
+
+def setup(bot):
+    pass
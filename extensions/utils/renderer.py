@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+# videobox renderer util
+# Renders commands from plain inputs, without Discord.
+
+'''Renderer File'''
+
+import os
+import uuid
+import ffmpeg
+from . import render_worker
+from . import encoding
+from .render_worker import RenderJob
+
+class RenderResult():
+    """The output file of a render and the trace of its stages."""
+
+    def __init__(self, output, trace):
+        self.output = output
+        self.trace = trace
+
+    @property
+    def size(self):
+        return self.trace.sizes.get('output')
+
+    @property
+    def metrics(self):
+        return self.trace.to_dict()
+
+    def __repr__(self):
+        attrs = [
+            ('output', self.output),
+            ('size', self.size),
+        ]
+        return '<%s %s>' % (self.__class__.__name__, ' '.join('%s=%r' % t for t in attrs))
+
+class Renderer():
+    """Creates render jobs from paths, text and options, and runs them.
+    The bot, the command line and render workers all render through this."""
+
+    def __init__(self, config=None, output_dir='cache'):
+        self.config = config or {}
+        self.output_dir = output_dir
+
+    @property
+    def commands(self):
+        """Gets every command that can be rendered."""
+        return sorted(set(command for (command, _) in render_worker.PIPELINES))
+
+    def job(self, command, inputs=None, text=None, output=None, queue_depth=0, **options):
+        """Creates a render job with options from the config, which keyword arguments override."""
+        if command not in self.commands:
+            raise KeyError(f'No pipeline for command: {command}')
+        backends = self.config.get('render_backends') or {}
+        options = dict({
+            'backend': backends.get(command, 'moviepy'),
+            'profile': encoding.select_profile(self.config, command, queue_depth),
+            'size_limit': None,
+            'size_target': self.config.get('size_target', 'vbr'),
+            'stitch_mpy_audio': self.config.get('stitch_mpy_audio', False),
+            'normalize_inputs': self.config.get('normalize_inputs', True),
+            'probe_sidecars': False,
+            'template_cache': self.template_cache_settings()
+        }, **options)
+        if not options['size_target']:
+            options['size_limit'] = None
+        output = output or os.path.join(self.output_dir, f'{uuid.uuid4().hex}.mp4')
+        return RenderJob(command, output, inputs=inputs, text=text, options=options)
+
+    def template_cache_settings(self):
+        size = self.config.get('template_cache_size', 256)
+        if not size:
+            return None
+        return {'path': os.path.join(self.output_dir, 'templates'), 'max_size': size * 1000000}
+
+    def render(self, job):
+        """Renders a job in this thread and returns the result."""
+        os.makedirs(os.path.dirname(job.output) or '.', exist_ok=True)
+        return RenderResult(*render_worker.run_job(job))
+
+    def can_stream(self, job):
+        return job.command in render_worker.STREAMS
+
+    def pipe_stream(self, job):
+        """Gets an FFmpeg stream that renders a job to stdout as fragmented MP4, keeping it
+        under the job's size limit. Probes the job's media, so only use this outside of the event loop."""
+        (streams, duration, args) = render_worker.STREAMS[job.command](job)
+        (args, _) = render_worker.ffmpeg_args(job, duration, **args)
+        return ffmpeg.output(*streams, 'pipe:', f='mp4', movflags='frag_keyframe+empty_moov', **args)
+
+def setup(bot):
+    bot.renderer = Renderer(bot.config)
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+# videobox result cache util
+# Keeps rendered videos around so identical renders are only done once.
+
+'''Result Cache File'''
+
+import os
+import json
+import time
+import hashlib
+
+class ResultCache():
+    """An on-disk cache of rendered videos, keyed by command, arguments, input media and render settings."""
+
+    # Options that don't change what a render looks like. The profile and size options
+    # only change its quality, which depends on the load and the guild, so any cached
+    # result that fits the size limit is served instead.
+    IGNORED_OPTIONS = ['template_cache', 'profile', 'size_limit', 'size_target']
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.path = 'cache/results'
+        self.ttl = bot.config.get('result_cache_ttl', 86400)
+        self.max_size = bot.config.get('result_cache_size', 512) * 1000000
+        self.refs = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0 and self.ttl > 0
+
+    def _hash_file(self, file_path):
+        sha1 = hashlib.sha1()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha1.update(chunk)
+        return sha1.hexdigest()
+
+    def _key(self, job):
+        key = {
+            'command': job.command,
+            'text': [text.strip() for text in job.text],
+            'inputs': [self._hash_file(file_path) for file_path in job.inputs],
+            'assets': {name: [os.path.getmtime(path), os.path.getsize(path)] for name, path in job.assets.items()},
+            'options': {name: value for name, value in job.options.items() if name not in self.IGNORED_OPTIONS}
+        }
+        return hashlib.sha1(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+
+    async def key(self, job):
+        """Gets the cache key of a job, hashing its inputs outside of the event loop."""
+        if not self.enabled:
+            return None
+        return await self.bot.utils.force_async(self._key, pool='io')(job)
+
+    def _paths(self, key):
+        return os.path.join(self.path, f'{key}.mp4'), os.path.join(self.path, f'{key}.json')
+
+    def get(self, key, size_limit=None):
+        """Gets a cached result as a (file path, upload URL) tuple, or None. Results that
+        weren't uploaded are only served if they fit the size limit. The key must be
+        given back with release()."""
+        if not key:
+            return None
+        (file_path, meta_path) = self._paths(key)
+        if self._expired(key) or not os.path.exists(file_path):
+            if not self.refs.get(key):
+                self.remove(key)
+            self.misses += 1
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if not meta.get('url') and size_limit and os.path.getsize(file_path) > size_limit:
+            self.misses += 1
+            return None
+        # Marks the result as recently used
+        os.utime(file_path)
+        self._use(key)
+        self.hits += 1
+        return file_path, meta.get('url')
+
+    def put(self, key, videoname):
+        """Moves a rendered file into the cache and returns its new path.
+        The key must be given back with release()."""
+        if not key:
+            return videoname
+        # Create cache if it doesn't exist
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+
+        (file_path, meta_path) = self._paths(key)
+        os.replace(videoname, file_path)
+        with open(meta_path, 'w') as f:
+            json.dump({'created': time.time(), 'url': None}, f)
+        self._use(key)
+        self.evict()
+        return file_path
+
+    def _use(self, key):
+        self.refs[key] = self.refs.get(key, 0) + 1
+
+    def release(self, key):
+        """Gives back a key from get() or put(), letting its result be evicted."""
+        if not key or key not in self.refs:
+            return
+        self.refs[key] -= 1
+        if self.refs[key] <= 0:
+            del self.refs[key]
+
+    def set_url(self, key, url):
+        """Remembers the upload URL of a cached result."""
+        (_, meta_path) = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        meta['url'] = url
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+
+    def remove(self, key):
+        for path in self._paths(key):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def evict(self):
+        """Removes expired results, then the least recently used ones until the cache fits its budget.
+        Results that are being sent are kept."""
+        entries = []
+        for file in os.listdir(self.path):
+            if not file.endswith('.mp4'):
+                continue
+            stat = os.stat(os.path.join(self.path, file))
+            entries.append((stat.st_mtime, stat.st_size, file[:-4]))
+
+        total = sum(entry[1] for entry in entries)
+        for (_, size, key) in sorted(entries):
+            if total <= self.max_size and not self._expired(key):
+                continue
+            if self.refs.get(key):
+                continue
+            self.remove(key)
+            total -= size
+
+    def _expired(self, key):
+        (_, meta_path) = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                return time.time() - json.load(f)['created'] > self.ttl
+        except (FileNotFoundError, ValueError, KeyError):
+            return True
+
+def setup(bot):
+    bot.result_cache = ResultCache(bot)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+# videobox telemetry util
+# Times the stages of renders and keeps percentiles of them.
+
+'''Telemetry File'''
+
+import json
+import math
+import time
+import threading
+import psutil
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+STAGES = ['download', 'probe', 'queue', 'normalize', 'setup', 'encode', 'mux', 'upload', 'send', 'total']
+
+class PeakRSS():
+    """Context manager that samples the RSS of this process and its children, like FFmpeg,
+    to find the peak while the block runs. Unlike ru_maxrss, this is per render even in
+    long-lived workers, though renders in the bot's process also count the bot itself."""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        try:
+            process = psutil.Process()
+            rss = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    rss += child.memory_info().rss
+                except psutil.Error:
+                    pass
+        except psutil.Error:
+            return
+        self.peak = max(self.peak, rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self):
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name='videobox-rss', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+class Trace():
+    """The durations and sizes of the stages of one render. Traces are picklable,
+    so render workers can time their own stages and send them back."""
+
+    def __init__(self, command=None):
+        self.command = command
+        self.created = time.time()
+        self.stages = OrderedDict()
+        self.sizes = {}
+        self.peak_rss = 0
+        self.failed = False
+        self._mark = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """Times the code inside the block as a stage."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start_time)
+
+    def lap(self, name):
+        """Records the time since the last stage ended as a stage."""
+        self.add(name, time.perf_counter() - self._mark)
+
+    def add(self, name, duration):
+        self.stages[name] = self.stages.get(name, 0) + duration
+        self._mark = time.perf_counter()
+
+    def merge(self, trace):
+        """Adds the stages of a trace from a render worker."""
+        for (name, duration) in trace.stages.items():
+            self.stages[name] = self.stages.get(name, 0) + duration
+        self.sizes.update(trace.sizes)
+        self.peak_rss = max(self.peak_rss, trace.peak_rss)
+
+    def to_dict(self):
+        return {
+            'command': self.command,
+            'created': self.created,
+            'stages': {name: round(duration, 4) for (name, duration) in self.stages.items()},
+            'sizes': self.sizes,
+            'peak_rss': self.peak_rss,
+            'failed': self.failed
+        }
+
+    def __repr__(self):
+        attrs = [
+            ('command', self.command),
+            ('stages', dict(self.stages)),
+        ]
+        return '<%s %s>' % (self.__class__.__name__, ' '.join('%s=%r' % t for t in attrs))
+
+def percentile(values, percent):
+    """Gets a nearest-rank percentile of some values."""
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+class Telemetry():
+    """Logs render traces as JSON lines and keeps a window of them for percentiles."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.window = bot.config.get('telemetry_window', 500)
+        self.log_path = bot.config.get('telemetry_log')
+        self.samples = {}
+        self.counts = {}
+        self.failures = {}
+
+    def trace(self, command):
+        return Trace(command)
+
+    def finish(self, trace):
+        """Records a finished trace."""
+        trace.stages['total'] = time.time() - trace.created
+        self._log(trace)
+
+        samples = self.samples.setdefault(trace.command, {'stages': {}, 'sizes': {}})
+        for (kind, values) in [('stages', trace.stages), ('sizes', trace.sizes)]:
+            for (name, value) in values.items():
+                if name not in samples[kind]:
+                    samples[kind][name] = deque(maxlen=self.window)
+                samples[kind][name].append(value)
+        self.counts[trace.command] = self.counts.get(trace.command, 0) + 1
+        if trace.failed:
+            self.failures[trace.command] = self.failures.get(trace.command, 0) + 1
+
+    def _log(self, trace):
+        if not self.log_path:
+            return
+        line = json.dumps(trace.to_dict(), separators=(',', ':'))
+        with open(self.log_path, 'a') as f:
+            f.write(line + '\n')
+
+    def percentiles(self, command, kind='stages'):
+        """Gets the p50, p95 and p99 of every stage (or size) of a command."""
+        result = OrderedDict()
+        samples = self.samples.get(command, {}).get(kind, {})
+        names = [name for name in STAGES if name in samples] + sorted(name for name in samples if name not in STAGES)
+        for name in names:
+            values = list(samples[name])
+            result[name] = {
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'p99': percentile(values, 99),
+                'count': len(values)
+            }
+        return result
+
+def setup(bot):
+    bot.telemetry = Telemetry(bot)
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+# videobox template cache util
+# Stores assets derived from templates so they are only built once.
+
+'''Template Cache File'''
+
+import os
+import json
+import uuid
+import time
+import hashlib
+import threading
+
+class TemplateCache():
+    """An on-disk LRU cache of derived assets, keyed by the hash of their sources and parameters."""
+
+    # Seconds a render can keep using a template after getting it, so
+    # templates used more recently than this are never evicted
+    MIN_AGE = 600
+
+    def __init__(self, path, max_size, min_age=MIN_AGE):
+        self.path = path
+        self.max_size = max_size
+        self.min_age = min_age
+        self.hits = 0
+        self.misses = 0
+        self._hashes = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+        # Create cache if it doesn't exist
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+
+    def asset_hash(self, asset_path):
+        """Gets the SHA-1 of an asset, only rehashing it when it changes."""
+        stat = os.stat(asset_path)
+        cached = self._hashes.get(asset_path)
+        if cached and cached[0] == (stat.st_mtime, stat.st_size):
+            return cached[1]
+        sha1 = hashlib.sha1()
+        with open(asset_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha1.update(chunk)
+        digest = sha1.hexdigest()
+        self._hashes[asset_path] = ((stat.st_mtime, stat.st_size), digest)
+        return digest
+
+    def key(self, assets, params):
+        key = {
+            'assets': [self.asset_hash(asset) for asset in assets],
+            'params': params
+        }
+        return hashlib.sha1(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get(self, name, assets, params, build, extension):
+        """Gets the path of a derived asset, calling build(path) to create it if it isn't cached."""
+        file_path = os.path.join(self.path, f'{name}-{self.key(assets, params)}.{extension}')
+
+        with self._lock:
+            lock = self._locks.setdefault(file_path, threading.Lock())
+        with lock:
+            if os.path.exists(file_path):
+                self.hits += 1
+                # Marks the template as recently used
+                os.utime(file_path)
+                return file_path
+
+            self.misses += 1
+            # The folder is recreated in case the cache was cleared
+            os.makedirs(self.path, exist_ok=True)
+            # Build to a temporary file so other processes never see half-written templates
+            temp_path = os.path.join(self.path, f'{name}.tmp-{uuid.uuid4().hex}.{extension}')
+            try:
+                build(temp_path)
+                os.replace(temp_path, file_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        self.evict()
+        return file_path
+
+    def evict(self):
+        """Removes the least recently used templates until the cache fits its size cap.
+        Renders in any process may still be reading recently used templates, so those are kept."""
+        entries = []
+        if not os.path.exists(self.path):
+            return
+        for file in os.listdir(self.path):
+            if '.tmp-' in file:
+                continue
+            try:
+                stat = os.stat(os.path.join(self.path, file))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file))
+
+        total = sum(entry[1] for entry in entries)
+        for (mtime, size, file) in sorted(entries):
+            if total <= self.max_size or mtime > time.time() - self.min_age:
+                break
+            try:
+                os.remove(os.path.join(self.path, file))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+_caches = {}
+
+def get_cache(path, max_size):
+    """Gets the template cache of this process for a path."""
+    if path not in _caches:
+        _caches[path] = TemplateCache(path, max_size)
+    return _caches[path]
+
+def setup(bot):
+    pass
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+# videobox uploader util
+# Uploads renders that are too large to attach.
+
+'''Uploader File'''
+
+import io
+import os
+import time
+import asyncio
+import aiohttp
+
+class UploadError(Exception):
+    def __init__(self, status):
+        self.status = status
+        super().__init__(f'Upload failed with status {status}')
+
+    @property
+    def retryable(self):
+        return self.status == 429 or self.status >= 500
+
+class Uploader():
+    """Uploads files to OwO with the bot's HTTP session, limiting concurrent uploads and retrying failures."""
+
+    UPLOAD_URL = 'https://api.awau.moe/upload/pomf'
+    FILE_URL = 'https://videobox.is-pretty.cool/'
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.request = bot.request
+        self.key = bot.config.get('owo_key')
+        self.retries = bot.config.get('upload_retries', 3)
+        self.semaphore = asyncio.Semaphore(bot.config.get('upload_concurrency', 2))
+        self.timeout = aiohttp.ClientTimeout(sock_connect=10, sock_read=60)
+        self.uploads = 0
+        self.failures = 0
+        self.retried = 0
+        self.bytes = 0
+        self.time = 0.0
+
+    @property
+    def enabled(self):
+        return bool(self.key)
+
+    async def upload(self, file, file_name='video.mp4'):
+        """Uploads a file path or file object and returns its URL."""
+        if not isinstance(file, str):
+            # aiohttp closes the file objects it sends, so attempts can't share the caller's.
+            # Files on disk are reopened for each attempt and anything else is read into memory.
+            name = getattr(file, 'name', None)
+            if isinstance(name, str) and os.path.exists(name):
+                file = name
+            else:
+                file.seek(0)
+                file = file.read()
+        attempt = 0
+        while True:
+            try:
+                async with self.semaphore:
+                    return await self._post(file, file_name)
+            except (aiohttp.ClientError, asyncio.TimeoutError, UploadError) as error:
+                if attempt >= self.retries or (isinstance(error, UploadError) and not error.retryable):
+                    self.failures += 1
+                    raise
+            attempt += 1
+            self.retried += 1
+            await asyncio.sleep(2 ** attempt)
+
+    async def _post(self, file, file_name):
+        f = open(file, 'rb') if isinstance(file, str) else io.BytesIO(file)
+        try:
+            f.seek(0, 2)
+            size = f.tell()
+            f.seek(0)
+            data = aiohttp.FormData()
+            # aiohttp streams file objects in chunks instead of reading them whole
+            data.add_field('files[]', f, filename=file_name, content_type='video/mp4')
+
+            start_time = time.perf_counter()
+            async with self.request.post(self.UPLOAD_URL, data=data, timeout=self.timeout,
+                headers={'Authorization': self.key}) as response:
+                if response.status != 200:
+                    raise UploadError(response.status)
+                result = await response.json(content_type=None)
+            self.time += time.perf_counter() - start_time
+            self.bytes += size
+            self.uploads += 1
+        finally:
+            f.close()
+
+        if not result.get('success'):
+            raise UploadError(result.get('errorcode', 500))
+        return self.FILE_URL + result['files'][0]['url'].split('/')[-1]
+
+    def throughput(self):
+        """Gets the average upload throughput in bytes per second."""
+        return self.bytes / self.time if self.time else 0
+
+    def stats(self):
+        return {
+            'uploads': self.uploads,
+            'failures': self.failures,
+            'retried': self.retried,
+            'bytes': self.bytes,
+            'seconds': self.time,
+            'throughput': self.throughput()
+        }
+
+def setup(bot):
+    bot.uploader = Uploader(bot)
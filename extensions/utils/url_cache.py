@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+# videobox url cache util
+# Remembers what the extractors resolved links to.
+
+'''URL Cache File'''
+
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+class URLCache():
+    """A bounded TTL cache of links resolved by the extractors, including links that resolved to nothing."""
+
+    # Seconds to keep results of each host, subdomains included
+    DEFAULT_TTLS = {
+        'vine.co': 604800,
+        'imgur.com': 604800,
+        'twitter.com': 86400,
+        'twitch.tv': 3600,
+        'clippituser.tv': 3600,
+        'instagram.com': 3600,
+        'streamable.com': 3600
+    }
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.ttls = dict(self.DEFAULT_TTLS, **(bot.config.get('url_cache_ttls') or {}))
+        self.default_ttl = 600
+        self.negative_ttl = 300
+        self.max_size = bot.config.get('url_cache_size', 1000)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _host_ttl(self, url):
+        host = (urlparse(url).hostname or '').lower()
+        while host:
+            if host in self.ttls:
+                return self.ttls[host]
+            host = host.partition('.')[2]
+        return None
+
+    def get(self, kind, url):
+        """Gets a cached result as a (found, result) tuple."""
+        entry = self.entries.get((kind, url))
+        if not entry or entry[0] < time.time():
+            if entry:
+                del self.entries[(kind, url)]
+            self.misses += 1
+            return False, None
+        self.entries.move_to_end((kind, url))
+        self.hits += 1
+        return True, entry[1]
+
+    def set(self, kind, url, result):
+        """Caches the result of resolving a link."""
+        ttl = self._host_ttl(url)
+        if result is None:
+            # Links to hosts without an extractor resolve to nothing without any requests
+            if ttl is None:
+                return
+            ttl = min(ttl, self.negative_ttl)
+        elif ttl is None:
+            ttl = self.default_ttl
+
+        self.entries[(kind, url)] = (time.time() + ttl, result)
+        self.entries.move_to_end((kind, url))
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+def setup(bot):
+    bot.url_cache = URLCache(bot)
@@ -12,7 +12,6 @@ import asyncio
 import discord
 import filetype
 import functools
-from concurrent.futures import ThreadPoolExecutor
 from aiohttp import ClientTimeout, ServerTimeoutError
 
 class FindMediaResponse():
@@ -49,7 +48,7 @@ class DownloadURLError(Exception):
             return f"**`{self.mime}`** is an invalid file type for this command!"
         elif self.type == 'timeout':
             return f"The request for the URL took too long!"
-        elif self.type == 'timeout':
+        elif self.type == 'badstatus':
             return f"*`{self.response.url}`* returns a **`{self.response.status}`** HTTP status code!"
         elif self.type == 'toolarge':
             return f"*`{self.response.url}`* is too large to process!"
@@ -92,6 +91,9 @@ class Utils():
             'image/webp',
             'image/gif'
         ]
+
+        # filetype only needs the first 261 bytes to guess a type
+        self.SNIFF_SIZE = 262
     
     def clean_content(self, content):
         """Cleans the content from spolers and no-embed markdown"""
@@ -142,12 +144,7 @@ class Utils():
             )
 
         if use_past:
-            if message.channel.guild and message.channel.guild.me.permissions_in(message.channel).read_message_history == False:
-                return
-            message_limit = self.bot.config['past_message_limit'] or 10
-            async for past_message in message.channel.history(limit=message_limit, before=message):
-                result = await self.find_video(past_message, use_past=False)
-                if result: return result
+            return await self._find_in_history(message, lambda past_message: self.find_video(past_message, use_past=False))
 
     async def find_photo(self, message, arg='', use_past=True):
         """Finds a photo URL in the Discord channel and returns it."""
@@ -240,63 +237,120 @@ class Utils():
                 )
 
         if use_past:
-            if message.channel.guild and message.channel.guild.me.permissions_in(message.channel).read_message_history == False:
-                return
-            message_limit = self.bot.config['past_message_limit'] or 10
-            async for past_message in message.channel.history(limit=message_limit, before=message):
-                result = await self.find_photo(past_message, use_past=False)
+            return await self._find_in_history(message, lambda past_message: self.find_photo(past_message, use_past=False))
+
+    async def _find_in_history(self, message, finder):
+        """Fetches the past messages once and searches them concurrently, returning the most recent result."""
+        if message.channel.guild and message.channel.guild.me.permissions_in(message.channel).read_message_history == False:
+            return
+        message_limit = self.bot.config['past_message_limit'] or 10
+        past_messages = await message.channel.history(limit=message_limit, before=message).flatten()
+        semaphore = asyncio.Semaphore(self.bot.config.get('history_concurrency') or 5)
+
+        async def search(past_message):
+            async with semaphore:
+                return await finder(past_message)
+
+        tasks = [asyncio.ensure_future(search(past_message)) for past_message in past_messages]
+        try:
+            # Newer messages come first, so the first result found in order wins
+            for task in tasks:
+                result = await task
                 if result: return result
+        finally:
+            for task in tasks:
+                task.cancel()
 
     async def download_url(self, url, supported_formats=[], skip_head=False):
         """Verifies and downloads a url and returns the file path."""
+        (file_path, _, _) = await self.download_url_info(url, supported_formats, skip_head=skip_head)
+        return file_path
+
+    async def download_url_info(self, url, supported_formats=[], skip_head=False, etag=None):
+        """Verifies and downloads a url and returns the file path, MIME type and ETag.
+        If an ETag is given and the file wasn't modified, the file path and MIME type are None."""
         timeout_seconds = self.bot.config['request_timeout'] or 10
         timeout = ClientTimeout(total=timeout_seconds)
+        max_size = 100000000 # 100MB
+        file_path = None
         try:
             # HEAD request
             if not skip_head:
                 async with self.request.head(url, timeout=timeout) as head_response:
-                    if not head_response.headers.get('content-length') or not head_response.headers.get('content-type'):
+                    if not head_response.headers.get('content-type'):
                         raise DownloadURLError('badrequest', response=head_response)
                     if not head_response.headers.get('content-type') in supported_formats:
                         raise DownloadURLError('badformat', response=head_response, mime=head_response.headers.get('content-type'))
                     if head_response.status < 200 or head_response.status >= 300:
                         raise DownloadURLError('badstatus', response=head_response)
-                    if int(head_response.headers.get('content-length')) > 100000000: # 100MB
+                    if int(head_response.headers.get('content-length') or 0) > max_size:
                         raise DownloadURLError('toolarge', response=head_response)
-            
-            async with self.request.get(url, timeout=timeout) as response:
+
+            headers = {'If-None-Match': etag} if etag else {}
+            async with self.request.get(url, timeout=timeout, headers=headers) as response:
+                if etag and response.status == 304:
+                    return None, None, etag
                 if response.status < 200 or response.status >= 300:
                     raise DownloadURLError('badstatus', response=response)
-                if int(response.headers.get('content-length')) > 100000000: # 100MB
+                if int(response.headers.get('content-length') or 0) > max_size:
                     raise DownloadURLError('toolarge', response=response)
 
                 # Create cache if it doesn't exist
                 if not os.path.exists('./cache'):
                     os.makedirs('./cache')
 
-                # Read buffer
-                buffer = await response.read()
-                response.close()
-                buffer_type = filetype.guess(buffer)
-                if not buffer_type or not buffer_type.mime in supported_formats:
-                    raise DownloadURLError('badformat', response=response, mime=buffer_type.mime)
-
-                # Write file
-                file_path = f"./cache/{uuid.uuid4().hex}.{buffer_type.extension}"
-                file = open(file_path, 'wb')
-                file.write(buffer)
-                file.close()
-                return file_path
-        except ServerTimeoutError as error:
+                # Stream to disk, sniffing the type from the first bytes
+                header = b''
+                size = 0
+                file = None
+                try:
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        size += len(chunk)
+                        if size > max_size:
+                            raise DownloadURLError('toolarge', response=response)
+                        if file:
+                            file.write(chunk)
+                            continue
+                        header += chunk
+                        if len(header) >= self.SNIFF_SIZE:
+                            file_path, mime, file = self._open_download(header, supported_formats, response)
+                    if not file:
+                        file_path, mime, file = self._open_download(header, supported_formats, response)
+                finally:
+                    if file:
+                        file.close()
+                return file_path, mime, response.headers.get('etag')
+        except (ServerTimeoutError, asyncio.TimeoutError) as error:
+            self._remove_download(file_path)
             raise DownloadURLError('timeout', error)
-
-    def force_async(self, fn):
-        """Forces sync functions to be async"""
-        pool = ThreadPoolExecutor()
+        except BaseException:
+            self._remove_download(file_path)
+            raise
+
+    def _open_download(self, header, supported_formats, response):
+        """Checks the type of a download from its header and opens its cache file."""
+        buffer_type = filetype.guess(header)
+        if not buffer_type or not buffer_type.mime in supported_formats:
+            raise DownloadURLError('badformat', response=response, mime=buffer_type.mime if buffer_type else None)
+
+        # Write file
+        file_path = f"./cache/{uuid.uuid4().hex}.{buffer_type.extension}"
+        file = open(file_path, 'wb')
+        file.write(header)
+        return file_path, buffer_type.mime, file
+
+    def _remove_download(self, file_path):
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
+
+    def force_async(self, fn=None, pool='render'):
+        """Forces sync functions to be async by running them in one of the bot's shared pools.
+        Use the `render` pool for CPU-bound work and the `io` pool for blocking I/O."""
+        if fn is None:
+            return functools.partial(self.force_async, pool=pool)
         @functools.wraps(fn)
         def wrapper(*args, **kwargs):
-            future = pool.submit(fn, *args, **kwargs)
-            return asyncio.wrap_future(future)  # make it awaitable
+            return self.bot.render_pool.submit(pool, fn, *args, **kwargs)  # make it awaitable
         return wrapper
 
     def humanbytes(self, B) -> str:
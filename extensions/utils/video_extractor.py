@@ -7,68 +7,26 @@
 
 import re
 import json
-import base64
 from bs4 import BeautifulSoup
-from discord.ext import commands
-from .utils import TwitterAuthException
+from .extractor import Extractor
 
-class VideoExtractor():
+class VideoExtractor(Extractor):
     """Provides a way to get video URLs from various URLs."""
 
     def __init__(self, bot):
-        self.bot = bot
-        self.request = bot.request
-        self.fake_user_agent = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_12_6) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/79.0.3924.0 Safari/537.36'
-
-        self.extractors = [
-            'extract_vine',
-            'extract_twitch_clip',
-            'extract_twitter',
-            'extract_clippit',
-            'extract_imgur',
-            'extract_instagram',
-            'extract_streamable'
-        ]
-
-    async def get_url(self, url):
-        """Gets a video URL from a URL."""
-
-        try:
-            for extractor in self.extractors:
-                result = await getattr(self, extractor)(url)
-                if result != None: return result
-            return None
-        except Exception as e:
-            print(e)
-            return None
-
-    def _to_json(self, obj):
-        return json.dumps(obj, separators=(',', ':'), ensure_ascii=True)
-
-    async def _refresh_twitter(self):
-        creds = self.bot.config['twitter']
-        auth = base64.b64encode(f"{creds['consumer']}:{creds['secret']}".encode('ascii')).decode("utf-8")
-
-        async with self.request.post(
-            url = "https://api.twitter.com/oauth2/token",
-            headers = {
-                'Authorization': f"Basic {auth}",
-                'Content-Type': "application/x-www-form-urlencoded"
-            },
-            data = 'grant_type=client_credentials'
-        ) as response:
-            if response.status == 403:
-                raise TwitterAuthException(response)
-            self.bot._twitter_token = (await response.json())['access_token']
-            response.close()
-
-    async def extract_vine(self, url):
+        super().__init__(bot, 'video', [
+            ('extract_vine', ['vine.co'], r"^https?://(?:www\.)?vine\.co/(?:v|oembed)/(\w+)"),
+            ('extract_twitch_clip', ['clips.twitch.tv', 'twitch.tv'], r"^https?://(?:clips\.twitch\.tv/(?:embed\?.*?\bclip=|(?:[^/]+/)*)|(?:www\.)?twitch\.tv\/[^/]+/clip/)([a-zA-Z]+)"),
+            ('extract_twitter', ['twitter.com'], r"^https?://twitter\.com/\w+/status/(\d{17,19})(?:/(?:video/(\d))?)?"),
+            ('extract_clippit', ['clippituser.tv'], r"^https?://(?:www\.)?clippituser\.tv/c/([a-z]+)"),
+            ('extract_imgur', ['imgur.com', 'i.imgur.com'], r"^https?://(?:i\.)?imgur\.com/(?!(?:a|gallery|(?:t(?:opic)?|r)/[^/]+)/)([a-zA-Z0-9]+)"),
+            ('extract_instagram', ['instagram.com'], r"^https?://(?:www\.)?instagram\.com/(?:p|tv)/(\w+)"),
+            ('extract_streamable', ['streamable.com'], r"^https?://streamable\.com/(?:[es]/)?(\w+)")
+        ])
+
+    async def extract_vine(self, url, match):
         """Get the MP4 link to a Vine URL."""
 
-        regex = r"^https?://(?:www\.)?vine\.co/(?:v|oembed)/(\w+)"
-        match = re.match(regex, url)
-        if(not match): return None
-
         async with self.request.get(
             url = f"https://archive.vine.co/posts/{match.groups()[0]}.json"
         ) as response:
@@ -79,13 +37,9 @@ class VideoExtractor():
             response.close()
             return vid_url
     
-    async def extract_twitch_clip(self, url):
+    async def extract_twitch_clip(self, url, match):
         """Get the MP4 link to a Twitch Clip URL."""
 
-        regex = r"^https?://(?:clips\.twitch\.tv/(?:embed\?.*?\bclip=|(?:[^/]+/)*)|(?:www\.)?twitch\.tv\/[^/]+/clip/)([a-zA-Z]+)"
-        match = re.match(regex, url)
-        if(not match): return None
-
         payload = [{
             'operationName': 'incrementClipViewCount',
             'variables': { 'input': { 'slug': match.groups()[0] } },
@@ -110,12 +64,9 @@ class VideoExtractor():
             if clip['data']['updateClipViewCount'] == None: return None
             return f"https://clips-media-assets2.twitch.tv/AT-cm%7C{clip['data']['updateClipViewCount']['clip']['id']}.mp4"
     
-    async def extract_twitter(self, url):
+    async def extract_twitter(self, url, match):
         """Get the MP4 link to a Twitter URL."""
 
-        regex = r"^https?://twitter\.com/\w+/status/(\d{17,19})(?:/(?:video/(\d))?)?"
-        match = re.match(regex, url)
-        if(not match): return None
         if(not self.bot.config['twitter']): return None
         if(not self.bot.config['twitter']['secret'] or
             not self.bot.config['twitter']['consumer']): return None
@@ -133,7 +84,7 @@ class VideoExtractor():
             elif response.status == 403:
                 response.close()
                 await self._refresh_twitter()
-                return await self.extract_twitter(url)
+                return await self.extract_twitter(url, match)
             data = await response.json()
             response.close()
             if data['extended_entities'] and data['extended_entities']['media'] and len(data['extended_entities']['media']) > 0:
@@ -151,13 +102,9 @@ class VideoExtractor():
                         if variant['content_type'] == 'video/mp4':
                             return variant['url']
 
-    async def extract_clippit(self, url):
+    async def extract_clippit(self, url, match):
         """Get the MP4 link to a Clippit URL."""
 
-        regex = r"^https?://(?:www\.)?clippituser\.tv/c/([a-z]+)"
-        match = re.match(regex, url)
-        if(not match): return None
-        
         async with self.request.get(url=url) as response:
             html = await response.text()
             response.close()
@@ -165,20 +112,14 @@ class VideoExtractor():
             if soup.select("#player-container[data-hd-file]"):
                 return soup.select("#player-container[data-hd-file]")[0]['data-hd-file']
 
-    async def extract_imgur(self, url):
+    async def extract_imgur(self, url, match):
         """Get the MP4 link to an Imgur URL."""
 
-        regex = r"^https?://(?:i\.)?imgur\.com/(?!(?:a|gallery|(?:t(?:opic)?|r)/[^/]+)/)([a-zA-Z0-9]+)"
-        match = re.match(regex, url)
-        if(not match): return None
         return f"https://i.imgur.com/{match.groups()[0]}.mp4"
 
-    async def extract_instagram(self, url):
+    async def extract_instagram(self, url, match):
         """Get the MP4 link to an Instagram URL."""
 
-        regex = r"^https?://(?:www\.)?instagram\.com/(?:p|tv)/(\w+)"
-        match = re.match(regex, url)
-        if(not match): return None
         async with self.request.get(url=url) as response:
             html = await response.text()
             response.close()
@@ -189,13 +130,9 @@ class VideoExtractor():
                 if data['entry_data']['PostPage'][0]['graphql']['shortcode_media']['__typename'] == 'GraphVideo':
                     return data['entry_data']['PostPage'][0]['graphql']['shortcode_media']['video_url']
 
-    async def extract_streamable(self, url):
+    async def extract_streamable(self, url, match):
         """Get the MP4 link to a Streamable URL."""
 
-        regex = r"^https?://streamable\.com/(?:[es]/)?(\w+)"
-        match = re.match(regex, url)
-        if(not match): return None
-        
         async with self.request.get(url=url) as response:
             html = await response.text()
             response.close()
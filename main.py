@@ -162,6 +162,15 @@ async def on_command_error(ctx, error):
         await ctx.send(f"`⏱️` **This command is on a cooldown!** Wait {error.retry_after:.0f} seconds before executing!")
         return
 
+    # The queue can also fill up between the admission check and the render
+    queue_error = getattr(error, 'original', error)
+    if type(queue_error).__name__ == 'RenderQueueFull':
+        if queue_error.user_limit:
+            await ctx.send(f"`⏱️` **You already have renders in the queue!** Wait for them to finish before executing!")
+        else:
+            await ctx.send(f"`⏱️` **The render queue is full!** Try again in about {queue_error.retry_after:.0f} seconds.")
+        return
+
     # Provides a very pretty embed if something's actually a dev's fault.
     elif isinstance(error, commands.CommandInvokeError):
 
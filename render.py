@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+# VideoBox - a bot that creates funny videos.
+# Renders the bot's commands on local files without connecting to Discord.
+# Usage: python render.py COMMAND [INPUT ...] [-t TEXT ...] [-j N] [-o OUTPUT]
+
+'''Render File'''
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from extensions.utils.renderer import Renderer
+
+# How many strings of text each command takes
+TEXT_COUNTS = {
+    'crabrave': 2,
+    'discordvid2': 2
+}
+
+def load_config(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def expand_inputs(patterns):
+    """Expands globs, keeping paths that don't match anything so they fail loudly."""
+    inputs = []
+    for pattern in patterns:
+        inputs.extend(sorted(glob.glob(pattern)) or [pattern])
+    return inputs
+
+def main():
+    parser = argparse.ArgumentParser(description='Renders a VideoBox command on local files.')
+    parser.add_argument('command')
+    parser.add_argument('inputs', nargs='*', help='input files or globs, one render each')
+    parser.add_argument('-t', '--text', nargs='+', default=[], help='text for crabrave and discordvid2')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='how many renders to run at once')
+    parser.add_argument('-o', '--output', default='renders', help='directory to write renders to')
+    parser.add_argument('-c', '--config', default='config.json', help='config to take render options from')
+    parser.add_argument('--backend', choices=['moviepy', 'ffmpeg'])
+    parser.add_argument('--profile', help='encode profile to use')
+    parser.add_argument('--json', action='store_true', help='print the trace of each render as JSON')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    if args.profile:
+        config['command_profiles'] = dict(config.get('command_profiles') or {}, **{args.command: args.profile})
+    renderer = Renderer(config)
+    if args.command not in renderer.commands:
+        parser.error(f"unknown command {args.command}, choose from {', '.join(renderer.commands)}")
+    if len(args.text) != TEXT_COUNTS.get(args.command, 0):
+        parser.error(f'{args.command} takes {TEXT_COUNTS.get(args.command, 0)} text arguments')
+
+    options = {'backend': args.backend} if args.backend else {}
+    inputs = expand_inputs(args.inputs)
+    os.makedirs(args.output, exist_ok=True)
+    if inputs:
+        jobs = []
+        names = set()
+        for path in inputs:
+            # Inputs with the same name in different folders get numbered
+            name = f'{args.command}-{os.path.splitext(os.path.basename(path))[0]}'
+            unique_name = name
+            while unique_name in names:
+                unique_name = f'{name}-{len(names)}'
+            names.add(unique_name)
+            jobs.append(renderer.job(args.command, inputs=[path], text=args.text,
+                output=os.path.join(args.output, f'{unique_name}.mp4'), **options))
+    else:
+        jobs = [renderer.job(args.command, text=args.text,
+            output=os.path.join(args.output, f'{args.command}.mp4'), **options)]
+
+    failed = 0
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = {executor.submit(renderer.render, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failed += 1
+                print(f'{job.output}: {type(e).__name__}: {e}', file=sys.stderr)
+                continue
+            if args.json:
+                print(json.dumps(dict(result.metrics, inputs=job.inputs, output=result.output)))
+            else:
+                stages = ', '.join(f'{name} {duration:.2f}s' for (name, duration) in result.trace.stages.items())
+                print(f'{result.output}: {stages}, {result.size / 1048576:.2f} MB')
+
+    print(f'Rendered {len(jobs) - failed}/{len(jobs)} in {time.time() - start_time:.2f} seconds.', file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
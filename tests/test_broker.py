@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+# videobox broker tests
+
+'''Broker Tests File'''
+
+import os
+import time
+import asyncio
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+from extensions.utils.broker import BrokerClient, MemoryBroker, RenderFailed, SQLiteBroker, Worker, get_broker
+
+class BrokerTests():
+    """Tests that every broker backend has to pass."""
+
+    def make_broker(self, max_attempts=2):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.broker = self.make_broker()
+
+    def test_claims_oldest_job_first(self):
+        first = self.broker.enqueue({'n': 1})
+        time.sleep(0.01)
+        self.broker.enqueue({'n': 2})
+        self.assertEqual(self.broker.claim('a'), (first, {'n': 1}))
+        self.assertEqual(self.broker.claim('b')[1], {'n': 2})
+        self.assertIsNone(self.broker.claim('c'))
+        self.assertEqual(self.broker.stats(), {'running': 2})
+
+    def test_complete(self):
+        job_id = self.broker.enqueue('job')
+        self.broker.claim('a')
+        self.assertEqual(self.broker.get(job_id), ('running', None, None))
+        # Only the worker that claimed a job can finish it
+        self.broker.complete(job_id, 'b', 'wrong')
+        self.assertEqual(self.broker.get(job_id)[0], 'running')
+        self.broker.complete(job_id, 'a', {'output': 'out.mp4'})
+        self.assertEqual(self.broker.get(job_id), ('done', {'output': 'out.mp4'}, None))
+
+    def test_heartbeat(self):
+        job_id = self.broker.enqueue('job')
+        self.broker.claim('a')
+        self.assertTrue(self.broker.heartbeat(job_id, 'a'))
+        self.assertFalse(self.broker.heartbeat(job_id, 'b'))
+        # Removed jobs make their worker give up
+        self.broker.remove(job_id)
+        self.assertFalse(self.broker.heartbeat(job_id, 'a'))
+        self.assertEqual(self.broker.get(job_id), (None, None, None))
+
+    def test_fail(self):
+        job_id = self.broker.enqueue('job')
+        self.broker.claim('a')
+        self.broker.fail(job_id, 'a', 'broken')
+        self.assertEqual(self.broker.get(job_id), ('failed', None, 'broken'))
+        self.assertIsNone(self.broker.claim('b'))
+
+    def test_fail_retries_until_out_of_attempts(self):
+        job_id = self.broker.enqueue('job')
+        self.broker.claim('a')
+        self.broker.fail(job_id, 'a', 'crashed', retry=True)
+        self.assertEqual(self.broker.get(job_id)[0], 'queued')
+        self.assertEqual(self.broker.claim('b'), (job_id, 'job'))
+        self.broker.fail(job_id, 'b', 'crashed', retry=True)
+        self.assertEqual(self.broker.get(job_id), ('failed', None, 'crashed'))
+
+    def test_requeues_stale_jobs(self):
+        job_id = self.broker.enqueue('job')
+        self.broker.claim('a')
+        self.broker.requeue_stale(60)
+        self.assertEqual(self.broker.get(job_id)[0], 'running')
+
+        self.broker.requeue_stale(-1)
+        self.assertEqual(self.broker.get(job_id)[0], 'queued')
+        # The stale worker lost the job to the next one
+        self.assertEqual(self.broker.claim('b'), (job_id, 'job'))
+        self.assertFalse(self.broker.heartbeat(job_id, 'a'))
+
+        self.broker.requeue_stale(-1)
+        (status, _, error) = self.broker.get(job_id)
+        self.assertEqual(status, 'failed')
+        self.assertIn('stopped responding', error)
+
+    def test_live_workers(self):
+        self.assertEqual(self.broker.live_workers(60), 0)
+        self.broker.seen('a')
+        self.broker.seen('a')
+        self.assertEqual(self.broker.live_workers(60), 1)
+        self.assertEqual(self.broker.live_workers(-1), 0)
+        # Workers busy rendering count through their job's heartbeat
+        self.broker.enqueue('job')
+        self.broker.claim('b')
+        self.assertEqual(self.broker.live_workers(60), 2)
+
+class MemoryBrokerTest(BrokerTests, unittest.TestCase):
+    def make_broker(self, max_attempts=2):
+        return MemoryBroker(max_attempts)
+
+class SQLiteBrokerTest(BrokerTests, unittest.TestCase):
+    def make_broker(self, max_attempts=2):
+        self.dir = tempfile.mkdtemp()
+        return SQLiteBroker(os.path.join(self.dir, 'broker.db'), max_attempts)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_jobs_are_shared_between_connections(self):
+        job_id = self.broker.enqueue({'n': 1})
+        other = SQLiteBroker(self.broker.path)
+        self.assertEqual(other.claim('a'), (job_id, {'n': 1}))
+        self.assertEqual(self.broker.get(job_id)[0], 'running')
+
+    def test_recreates_a_deleted_database(self):
+        self.broker.enqueue('job')
+        os.remove(self.broker.path)
+        job_id = self.broker.enqueue('job')
+        self.assertEqual(self.broker.claim('a'), (job_id, 'job'))
+
+class GetBrokerTest(unittest.TestCase):
+    def test_backends(self):
+        self.assertIsInstance(get_broker({}), MemoryBroker)
+        self.assertEqual(get_broker({'max_attempts': 5}).max_attempts, 5)
+        directory = tempfile.mkdtemp()
+        try:
+            broker = get_broker({'backend': 'sqlite', 'path': os.path.join(directory, 'queue', 'broker.db')})
+            self.assertIsInstance(broker, SQLiteBroker)
+            self.assertTrue(os.path.exists(broker.path))
+        finally:
+            shutil.rmtree(directory)
+
+class FlakyBroker(MemoryBroker):
+    """A broker whose database is locked the first time a job is claimed."""
+
+    def __init__(self, stop):
+        super().__init__()
+        self.stop = stop
+        self.claims = 0
+
+    def claim(self, worker):
+        self.claims += 1
+        if self.claims == 1:
+            raise sqlite3.OperationalError('database is locked')
+        self.stop.set()
+        return None
+
+class WorkerTest(unittest.TestCase):
+    def test_keeps_polling_after_broker_errors(self):
+        stop = threading.Event()
+        broker = FlakyBroker(stop)
+        worker = Worker(broker, renderer=None, name='test', poll=0)
+        worker.run(stop)
+        self.assertEqual(broker.claims, 2)
+
+class RenderPool():
+    async def submit(self, kind, fn, *args):
+        return fn(*args)
+
+class Bot():
+    config = {}
+    render_pool = RenderPool()
+
+class BrokerClientTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_job(self, client):
+        return self.loop.run_until_complete(client.run_job('job'))
+
+    def test_fails_without_workers(self):
+        client = BrokerClient(Bot(), {'workers': 0, 'poll': 0})
+        with self.assertRaisesRegex(RenderFailed, 'No render workers'):
+            self.run_job(client)
+        # The job doesn't wait in the queue for a worker that may never come
+        self.assertEqual(client.broker.stats(), {})
+
+    def test_fails_when_no_worker_claims_the_job(self):
+        client = BrokerClient(Bot(), {'workers': 0, 'poll': 0, 'queue_timeout': 0.05})
+        client.broker.seen('busy')
+        with self.assertRaisesRegex(RenderFailed, 'in time'):
+            self.run_job(client)
+        self.assertEqual(client.broker.stats(), {})
+
+if __name__ == '__main__':
+    unittest.main()
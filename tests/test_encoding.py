@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+# videobox encoding tests
+
+'''Encoding Tests File'''
+
+import unittest
+from extensions.utils import encoding
+
+class SelectProfileTest(unittest.TestCase):
+    def test_default_profile(self):
+        profile = encoding.select_profile({}, 'crabrave')
+        self.assertEqual(profile['name'], 'default')
+        self.assertEqual(profile['preset'], 'ultrafast')
+
+    def test_command_profiles(self):
+        config = {'command_profiles': {'crabrave': 'quality'}}
+        self.assertEqual(encoding.select_profile(config, 'crabrave')['name'], 'quality')
+        self.assertEqual(encoding.select_profile(config, 'theboys')['name'], 'default')
+
+    def test_draft_when_the_queue_is_deep(self):
+        config = {'command_profiles': {'crabrave': 'quality'}, 'draft_queue_depth': 3}
+        self.assertEqual(encoding.select_profile(config, 'crabrave', queue_depth=2)['name'], 'quality')
+        self.assertEqual(encoding.select_profile(config, 'crabrave', queue_depth=3)['name'], 'draft')
+        config['draft_queue_depth'] = 0
+        self.assertEqual(encoding.select_profile(config, 'crabrave', queue_depth=100)['name'], 'quality')
+
+    def test_config_profiles(self):
+        config = {
+            'encode_profiles': {'quality': {'preset': 'medium'}, 'nvenc': {'vcodec': 'h264_nvenc'}},
+            'command_profiles': {'crabrave': 'nvenc', 'theboys': 'missing'}
+        }
+        self.assertEqual(encoding.get_profiles(config)['quality']['crf'], 23)
+        self.assertEqual(encoding.get_profiles(config)['quality']['preset'], 'medium')
+        nvenc = encoding.select_profile(config, 'crabrave')
+        self.assertEqual((nvenc['vcodec'], nvenc['acodec']), ('h264_nvenc', 'libmp3lame'))
+        # Unknown profiles fall back to the default one
+        self.assertEqual(encoding.select_profile(config, 'theboys')['vcodec'], 'libx264')
+
+class BitrateTest(unittest.TestCase):
+    def test_lowest_bitrate(self):
+        self.assertEqual(encoding.lowest_bitrate('150k', 2000000), 150000)
+        self.assertEqual(encoding.lowest_bitrate('1.5M', None, '2m'), 1500000)
+        self.assertIsNone(encoding.lowest_bitrate(None))
+
+    def test_target_bitrate_fits_the_limit(self):
+        bitrate = encoding.target_bitrate(10, 8000000, '128k')
+        self.assertLessEqual((bitrate + 128000) * 10 / 8, 8000000)
+        self.assertEqual(bitrate, int(8000000 * 8 * 0.9 / 10 - 128000))
+
+    def test_target_bitrate_has_a_floor(self):
+        self.assertEqual(encoding.target_bitrate(3600, 8000000), 100000)
+
+    def test_fit_bitrate(self):
+        profile = dict(encoding.DEFAULT_PROFILES['default'])
+        self.assertEqual(encoding.fit_bitrate(profile, 10, 8000000), encoding.target_bitrate(10, 8000000))
+        # A profile bitrate that already fits doesn't need a cap
+        profile['video_bitrate'] = '1M'
+        self.assertIsNone(encoding.fit_bitrate(profile, 10, 8000000))
+        profile['video_bitrate'] = '10M'
+        self.assertEqual(encoding.fit_bitrate(profile, 10, 8000000), encoding.target_bitrate(10, 8000000))
+
+    def test_fit_bitrate_counts_the_audio_bitrate(self):
+        draft = encoding.DEFAULT_PROFILES['draft']
+        self.assertEqual(encoding.fit_bitrate(draft, 10, 8000000), encoding.target_bitrate(10, 8000000, '96k'))
+
+class ArgsTest(unittest.TestCase):
+    def test_ffmpeg_args(self):
+        args = encoding.ffmpeg_args(encoding.DEFAULT_PROFILES['draft'])
+        self.assertEqual(args['crf'], 32)
+        self.assertEqual(args['tune'], 'fastdecode')
+        self.assertNotIn('maxrate', args)
+
+    def test_ffmpeg_args_cap(self):
+        args = encoding.ffmpeg_args(dict(encoding.DEFAULT_PROFILES['default'], video_bitrate='5M'), 1000000)
+        self.assertEqual((args['maxrate'], args['bufsize'], args['video_bitrate']), (1000000, 2000000, 1000000))
+
+    def test_moviepy_args_cap(self):
+        args = encoding.moviepy_args(encoding.DEFAULT_PROFILES['quality'], 1000000)
+        self.assertIsNone(args['bitrate'])
+        self.assertEqual(args['ffmpeg_params'][-4:], ['-maxrate', '1000000', '-bufsize', '2000000'])
+        self.assertIn('-crf', args['ffmpeg_params'])
+
+    def test_audio_extension(self):
+        self.assertEqual(encoding.audio_extension('libmp3lame'), 'mp3')
+        self.assertEqual(encoding.audio_extension('aac'), 'm4a')
+        self.assertEqual(encoding.audio_extension('something_else'), 'mka')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+# videobox input cache tests
+
+'''Input Cache Tests File'''
+
+import os
+import shutil
+import asyncio
+import tempfile
+import unittest
+from extensions.utils.input_cache import InputCache
+from extensions.utils.utils import DownloadURLError
+
+class Utils():
+    """Stands in for the bot's downloader, writing a file for every download."""
+
+    def __init__(self, dir, size=100):
+        self.dir = dir
+        self.size = size
+        self.downloads = []
+        self.not_modified = False
+
+    async def download_url_info(self, url, supported_formats=[], skip_head=False, etag=None):
+        await asyncio.sleep(0)
+        if etag and self.not_modified:
+            return None, None, etag
+        self.downloads.append(url)
+        file_path = os.path.join(self.dir, f'{len(self.downloads)}.mp4')
+        with open(file_path, 'wb') as f:
+            f.write(b'\0' * self.size)
+        return file_path, 'video/mp4', f'"{len(self.downloads)}"'
+
+class Bot():
+    def __init__(self, config, utils):
+        self.config = config
+        self.utils = utils
+
+class InputCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.utils = Utils(self.dir)
+        self.cache = InputCache(Bot({'input_cache_ttl': 60}, self.utils))
+        self.cache.max_size = 250
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+        shutil.rmtree(self.dir)
+
+    def fetch(self, url, supported_formats=[]):
+        return self.loop.run_until_complete(self.cache.fetch(url, supported_formats))
+
+    def test_fetches_are_cached(self):
+        first = self.fetch('https://a')
+        self.cache.release(first)
+        second = self.fetch('https://a')
+        self.assertEqual(first, second)
+        self.assertEqual(self.utils.downloads, ['https://a'])
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_concurrent_fetches_share_a_download(self):
+        async def fetch_twice():
+            return await asyncio.gather(self.cache.fetch('https://a'), self.cache.fetch('https://a'))
+
+        (first, second) = self.loop.run_until_complete(fetch_twice())
+        self.assertEqual(first, second)
+        self.assertEqual(self.utils.downloads, ['https://a'])
+        self.assertEqual(self.cache.coalesced, 1)
+        self.assertEqual(self.cache.entries['https://a'].refs, 2)
+
+    def test_rejects_unsupported_formats(self):
+        self.cache.release(self.fetch('https://a'))
+        with self.assertRaises(DownloadURLError):
+            self.fetch('https://a', supported_formats=['image/png'])
+        self.assertEqual(self.cache.entries['https://a'].refs, 0)
+
+    def test_revalidates_expired_entries(self):
+        file_path = self.fetch('https://a')
+        self.cache.release(file_path)
+        self.cache.entries['https://a'].created -= 120
+        self.utils.not_modified = True
+        self.assertEqual(self.fetch('https://a'), file_path)
+        self.assertEqual(self.cache.revalidated, 1)
+        self.assertEqual(len(self.utils.downloads), 1)
+
+    def test_evicts_unused_files(self):
+        paths = [self.fetch(url) for url in ['https://a', 'https://b']]
+        for file_path in paths:
+            self.cache.release(file_path)
+        self.fetch('https://c')
+        self.assertNotIn('https://a', self.cache.entries)
+        self.assertFalse(os.path.exists(paths[0]))
+        self.assertTrue(os.path.exists(paths[1]))
+
+    def test_keeps_files_in_use(self):
+        used = self.fetch('https://a')
+        self.cache.release(self.fetch('https://b'))
+        self.fetch('https://c')
+        self.assertTrue(os.path.exists(used))
+        self.assertNotIn('https://b', self.cache.entries)
+
+    def test_deletes_evicted_files_once_released(self):
+        used = self.fetch('https://a')
+        self.cache.entries['https://a'].created -= 120
+        # The ETag no longer matches, so the expired entry is replaced while it's still in use
+        self.fetch('https://a')
+        self.assertTrue(os.path.exists(used))
+        self.cache.release(used)
+        self.assertFalse(os.path.exists(used))
+        self.assertNotIn(used, self.cache.paths)
+
+if __name__ == '__main__':
+    unittest.main()
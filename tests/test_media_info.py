@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+# videobox media info tests
+
+'''Media Info Tests File'''
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from extensions.utils import media_info
+
+PROBE = {
+    'format': {'duration': '12.5', 'size': '1000'},
+    'streams': [
+        {'codec_type': 'video', 'codec_name': 'h264', 'width': 1920, 'height': 1080, 'avg_frame_rate': '30000/1001'},
+        {'codec_type': 'audio', 'codec_name': 'aac'}
+    ]
+}
+
+class MediaInfoTest(unittest.TestCase):
+    def tearDown(self):
+        media_info._probes.clear()
+
+    def test_parses_probes(self):
+        info = media_info.MediaInfo(PROBE)
+        self.assertEqual((info.duration, info.width, info.height), (12.5, 1920, 1080))
+        self.assertAlmostEqual(info.fps, 29.97, places=2)
+        self.assertTrue(info.has_video)
+        self.assertTrue(info.has_audio)
+
+    def test_unknown_duration(self):
+        info = media_info.MediaInfo({'format': {}, 'streams': []})
+        self.assertEqual(info.duration, 0)
+        self.assertFalse(info.has_video)
+
+    def test_remembers_recent_probes(self):
+        for index in range(media_info.MAX_PROBES + 10):
+            media_info._remember(f'{index}.mp4', [index, 1], PROBE)
+        self.assertEqual(len(media_info._probes), media_info.MAX_PROBES)
+        self.assertIsNone(media_info._recall('0.mp4', [0, 1]))
+        last = f'{media_info.MAX_PROBES + 9}.mp4'
+        self.assertEqual(media_info._recall(last, [media_info.MAX_PROBES + 9, 1]), PROBE)
+        # Files that changed since they were probed are probed again
+        self.assertIsNone(media_info._recall(last, [0, 2]))
+
+class ProbeFileTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.file = os.path.join(self.dir, 'input.mp4')
+        with open(self.file, 'wb') as f:
+            f.write(b'video')
+
+    def tearDown(self):
+        media_info._probes.clear()
+        shutil.rmtree(self.dir)
+
+    def probe(self, **kwargs):
+        with mock.patch.object(media_info.ffmpeg, 'probe', return_value=PROBE) as probe:
+            info = media_info.probe_file(self.file, **kwargs)
+        self.assertEqual(info.duration, 12.5)
+        return probe.call_count
+
+    def test_leaves_no_sidecar_by_default(self):
+        self.probe()
+        self.assertEqual(os.listdir(self.dir), ['input.mp4'])
+
+    def test_shares_sidecars(self):
+        self.assertEqual(self.probe(sidecar=True), 1)
+        self.assertTrue(os.path.exists(self.file + '.probe.json'))
+        # Another process reads the sidecar instead of probing again
+        media_info._probes.clear()
+        self.assertEqual(self.probe(sidecar=True), 0)
+
+if __name__ == '__main__':
+    unittest.main()
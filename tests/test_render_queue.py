@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+# videobox render queue tests
+
+'''Render Queue Tests File'''
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+from extensions.utils.render_queue import RenderQueue, RenderQueueFull
+
+class Bot():
+    def __init__(self, config):
+        self.config = config
+
+def context(guild_id, user_id):
+    guild = SimpleNamespace(id=guild_id) if guild_id else None
+    return SimpleNamespace(guild=guild, author=SimpleNamespace(id=user_id))
+
+class RenderQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.queue = RenderQueue(Bot({'render_concurrency': 1, 'render_backlog': 4, 'render_user_limit': 2}))
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_runs_up_to_concurrency(self):
+        first = self.queue.enqueue(context(1, 10))
+        second = self.queue.enqueue(context(2, 20))
+        self.assertTrue(first.future.done())
+        self.assertFalse(second.future.done())
+        self.assertEqual(self.queue.running, 1)
+        self.assertEqual(self.queue.depth, 1)
+
+        self.queue.release(first)
+        self.assertTrue(second.future.done())
+        self.assertEqual(self.queue.running, 1)
+        self.assertEqual(self.queue.depth, 0)
+
+    def test_guilds_take_turns(self):
+        running = self.queue.enqueue(context(3, 30))
+        tickets = [self.queue.enqueue(context(1, user)) for user in [10, 11, 12]]
+        other = self.queue.enqueue(context(2, 20))
+        self.assertEqual([self.queue.position(ticket) for ticket in tickets + [other]], [1, 3, 4, 2])
+
+        order = []
+        current = running
+        for _ in range(4):
+            self.queue.release(current)
+            current = next(ticket for ticket in tickets + [other] if ticket.future.done() and ticket not in order)
+            order.append(current)
+        self.assertEqual(order, [tickets[0], other, tickets[1], tickets[2]])
+
+    def test_direct_messages_get_a_bucket_per_user(self):
+        self.queue.enqueue(context(None, 10))
+        first = self.queue.enqueue(context(None, 10))
+        second = self.queue.enqueue(context(None, 11))
+        self.assertEqual(self.queue.position(first), 1)
+        self.assertEqual(self.queue.position(second), 2)
+
+    def test_rejects_past_backlog(self):
+        self.queue.enqueue(context(1, 10))
+        for user in range(4):
+            self.queue.enqueue(context(2, 20 + user))
+        with self.assertRaises(RenderQueueFull) as error:
+            self.queue.enqueue(context(3, 30))
+        self.assertFalse(error.exception.user_limit)
+        self.assertGreater(error.exception.retry_after, 0)
+
+    def test_rejects_past_user_limit(self):
+        self.queue.enqueue(context(1, 10))
+        self.queue.enqueue(context(2, 10))
+        with self.assertRaises(RenderQueueFull) as error:
+            self.queue.check(context(3, 10))
+        self.assertTrue(error.exception.user_limit)
+        self.queue.check(context(3, 11))
+
+    def test_releasing_a_waiting_ticket_leaves_the_queue(self):
+        running = self.queue.enqueue(context(1, 10))
+        waiting = self.queue.enqueue(context(2, 20))
+        self.queue.release(waiting)
+        self.assertTrue(waiting.future.cancelled())
+        self.assertEqual(self.queue.depth, 0)
+        self.assertNotIn(20, self.queue.user_counts)
+
+        self.queue.release(running)
+        self.assertEqual(self.queue.running, 0)
+        self.assertEqual(self.queue.user_counts, {})
+
+    def test_slot_reports_positions_and_frees_on_exit(self):
+        positions = []
+
+        async def on_position(position):
+            positions.append(position)
+
+        async def render(ctx, hold):
+            async with self.queue.slot(ctx, on_position):
+                await hold
+
+        async def run():
+            hold = self.loop.create_future()
+            first = self.loop.create_task(render(context(1, 10), hold))
+            await asyncio.sleep(0)
+            second = self.loop.create_task(render(context(2, 20), asyncio.sleep(0)))
+            await asyncio.sleep(0)
+            hold.set_result(None)
+            await asyncio.gather(first, second)
+
+        self.loop.run_until_complete(run())
+        self.assertEqual(positions, [1, 0])
+        self.assertEqual(self.queue.running, 0)
+        self.assertEqual(self.queue.depth, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+# videobox result cache tests
+
+'''Result Cache Tests File'''
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from extensions.utils.result_cache import ResultCache
+
+class Bot():
+    def __init__(self, config):
+        self.config = config
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = ResultCache(Bot({'result_cache_size': 1, 'result_cache_ttl': 60}))
+        self.cache.path = os.path.join(self.dir, 'results')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, name, size):
+        path = os.path.join(self.dir, name)
+        with open(path, 'wb') as f:
+            f.write(b'\0' * size)
+        return path
+
+    def job(self, text=None, inputs=None, **options):
+        return SimpleNamespace(command='tobecontinued', text=text or [], inputs=inputs or [], assets={}, options=options)
+
+    def age(self, key, seconds):
+        (file_path, _) = self.cache._paths(key)
+        stat = os.stat(file_path)
+        os.utime(file_path, (stat.st_atime - seconds, stat.st_mtime - seconds))
+
+    def test_key_ignores_quality_options(self):
+        video = self.write('input.mp4', 10)
+        key = self.cache._key(self.job(inputs=[video], backend='ffmpeg', profile={'name': 'default'}, size_limit=8000000))
+        self.assertEqual(key, self.cache._key(self.job(inputs=[video], backend='ffmpeg',
+            profile={'name': 'draft'}, size_limit=100000000, size_target='twopass', template_cache={'path': 'x'})))
+        self.assertNotEqual(key, self.cache._key(self.job(inputs=[video], backend='moviepy')))
+
+    def test_key_follows_text_and_input_contents(self):
+        first = self.write('first.mp4', 10)
+        second = self.write('second.mp4', 10)
+        self.assertEqual(self.cache._key(self.job(inputs=[first])), self.cache._key(self.job(inputs=[second])))
+        self.assertNotEqual(self.cache._key(self.job(inputs=[first])), self.cache._key(self.job(inputs=[self.write('third.mp4', 11)])))
+        self.assertEqual(self.cache._key(self.job(text=['top '])), self.cache._key(self.job(text=['top'])))
+        self.assertNotEqual(self.cache._key(self.job(text=['top'])), self.cache._key(self.job(text=['bottom'])))
+
+    def test_put_and_get(self):
+        file_path = self.cache.put('a', self.write('render.mp4', 100))
+        self.cache.release('a')
+        self.assertFalse(os.path.exists(os.path.join(self.dir, 'render.mp4')))
+        self.assertEqual(self.cache.get('a'), (file_path, None))
+        self.cache.release('a')
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_get_skips_results_over_the_size_limit(self):
+        file_path = self.cache.put('a', self.write('render.mp4', 100))
+        self.cache.release('a')
+        self.assertIsNone(self.cache.get('a', size_limit=50))
+        self.assertTrue(os.path.exists(file_path))
+
+        # Uploaded results are sent as links, so they fit any limit
+        self.cache.set_url('a', 'https://example.com/a.mp4')
+        self.assertEqual(self.cache.get('a', size_limit=50), (file_path, 'https://example.com/a.mp4'))
+
+    def test_get_drops_expired_results(self):
+        file_path = self.cache.put('a', self.write('render.mp4', 100))
+        self.cache.release('a')
+        (_, meta_path) = self.cache._paths('a')
+        with open(meta_path, 'w') as f:
+            json.dump({'created': 0, 'url': None}, f)
+        self.assertIsNone(self.cache.get('a'))
+        self.assertFalse(os.path.exists(file_path))
+
+    def test_evicts_least_recently_used(self):
+        self.cache.max_size = 250
+        for (key, age) in [('a', 30), ('b', 20)]:
+            self.cache.put(key, self.write(f'{key}.mp4', 100))
+            self.cache.release(key)
+            self.age(key, age)
+        self.cache.put('c', self.write('c.mp4', 100))
+        self.cache.release('c')
+        self.assertFalse(os.path.exists(self.cache._paths('a')[0]))
+        self.assertTrue(os.path.exists(self.cache._paths('b')[0]))
+        self.assertTrue(os.path.exists(self.cache._paths('c')[0]))
+
+    def test_keeps_results_in_use(self):
+        self.cache.max_size = 150
+        self.cache.put('a', self.write('a.mp4', 100))
+        self.age('a', 30)
+        self.cache.put('b', self.write('b.mp4', 100))
+        self.assertTrue(os.path.exists(self.cache._paths('a')[0]))
+
+        self.cache.release('a')
+        self.cache.evict()
+        self.assertFalse(os.path.exists(self.cache._paths('a')[0]))
+        self.assertTrue(os.path.exists(self.cache._paths('b')[0]))
+        self.cache.release('b')
+        self.assertEqual(self.cache.refs, {})
+
+    def test_disabled_without_budget(self):
+        cache = ResultCache(Bot({'result_cache_size': 0}))
+        self.assertFalse(cache.enabled)
+        self.assertIsNone(cache.get(None))
+        self.assertEqual(cache.put(None, 'render.mp4'), 'render.mp4')
+
+if __name__ == '__main__':
+    unittest.main()
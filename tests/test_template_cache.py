@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+# videobox template cache tests
+
+'''Template Cache Tests File'''
+
+import os
+import shutil
+import tempfile
+import unittest
+from extensions.utils.template_cache import TemplateCache
+
+class TemplateCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.asset = os.path.join(self.dir, 'asset.png')
+        with open(self.asset, 'wb') as f:
+            f.write(b'asset')
+        self.builds = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def build(self, path):
+        self.builds += 1
+        with open(path, 'wb') as f:
+            f.write(b'\0' * 100)
+
+    def get(self, cache, name, params={}):
+        return cache.get(name, [self.asset], params, self.build, 'bin')
+
+    def age(self, path, seconds):
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime - seconds, stat.st_mtime - seconds))
+
+    def test_builds_once(self):
+        cache = TemplateCache(os.path.join(self.dir, 'templates'), 1000)
+        path = self.get(cache, 'a')
+        self.assertEqual(self.get(cache, 'a'), path)
+        self.assertNotEqual(self.get(cache, 'a', {'size': 2}), path)
+        self.assertEqual(self.builds, 2)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_evicts_templates_unused_for_longer_than_a_render(self):
+        cache = TemplateCache(os.path.join(self.dir, 'templates'), 150, min_age=60)
+        old = self.get(cache, 'old')
+        self.age(old, 120)
+        self.get(cache, 'new')
+        self.assertFalse(os.path.exists(old))
+
+    def test_keeps_recently_used_templates(self):
+        cache = TemplateCache(os.path.join(self.dir, 'templates'), 150, min_age=60)
+        first = self.get(cache, 'first')
+        second = self.get(cache, 'second')
+        # Both could still be open in a render, so the cache stays over its cap
+        self.assertTrue(os.path.exists(first))
+        self.assertTrue(os.path.exists(second))
+
+    def test_rebuilds_after_the_folder_is_cleared(self):
+        cache = TemplateCache(os.path.join(self.dir, 'templates'), 1000)
+        self.get(cache, 'a')
+        shutil.rmtree(cache.path)
+        self.assertTrue(os.path.exists(self.get(cache, 'a')))
+        self.assertEqual(self.builds, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+# videobox url cache tests
+
+'''URL Cache Tests File'''
+
+import time
+import unittest
+from extensions.utils.url_cache import URLCache
+
+class Bot():
+    def __init__(self, config):
+        self.config = config
+
+class URLCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = URLCache(Bot({'url_cache_ttls': {'example.com': 120}, 'url_cache_size': 3}))
+
+    def expires_in(self, kind, url):
+        return self.cache.entries[(kind, url)][0] - time.time()
+
+    def test_caches_results(self):
+        self.assertEqual(self.cache.get('video', 'https://imgur.com/a'), (False, None))
+        self.cache.set('video', 'https://imgur.com/a', 'https://i.imgur.com/a.mp4')
+        self.assertEqual(self.cache.get('video', 'https://imgur.com/a'), (True, 'https://i.imgur.com/a.mp4'))
+        self.assertEqual(self.cache.get('photo', 'https://imgur.com/a'), (False, None))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_ttls_by_host(self):
+        self.cache.set('video', 'https://vine.co/v/a', 'a')
+        self.cache.set('video', 'https://clips.twitch.tv/a', 'b')
+        self.cache.set('video', 'https://example.com/a', 'c')
+        self.assertAlmostEqual(self.expires_in('video', 'https://vine.co/v/a'), 604800, delta=5)
+        # Subdomains use the TTL of their host
+        self.assertAlmostEqual(self.expires_in('video', 'https://clips.twitch.tv/a'), 3600, delta=5)
+        # The config overrides and adds hosts
+        self.assertAlmostEqual(self.expires_in('video', 'https://example.com/a'), 120, delta=5)
+
+    def test_unknown_hosts(self):
+        self.cache.set('video', 'https://unknown.org/a', 'a')
+        self.assertAlmostEqual(self.expires_in('video', 'https://unknown.org/a'), self.cache.default_ttl, delta=5)
+        # Links to hosts without an extractor aren't remembered as resolving to nothing
+        self.cache.set('video', 'https://unknown.org/b', None)
+        self.assertNotIn(('video', 'https://unknown.org/b'), self.cache.entries)
+
+    def test_negative_results_expire_sooner(self):
+        self.cache.set('video', 'https://vine.co/v/a', None)
+        self.assertEqual(self.cache.get('video', 'https://vine.co/v/a'), (True, None))
+        self.assertAlmostEqual(self.expires_in('video', 'https://vine.co/v/a'), self.cache.negative_ttl, delta=5)
+        self.cache.set('video', 'https://example.com/a', None)
+        self.assertAlmostEqual(self.expires_in('video', 'https://example.com/a'), 120, delta=5)
+
+    def test_expired_results_are_dropped(self):
+        self.cache.set('video', 'https://imgur.com/a', 'a')
+        self.cache.entries[('video', 'https://imgur.com/a')] = (time.time() - 1, 'a')
+        self.assertEqual(self.cache.get('video', 'https://imgur.com/a'), (False, None))
+        self.assertNotIn(('video', 'https://imgur.com/a'), self.cache.entries)
+
+    def test_evicts_least_recently_used(self):
+        for name in ['a', 'b', 'c']:
+            self.cache.set('video', f'https://imgur.com/{name}', name)
+        self.cache.get('video', 'https://imgur.com/a')
+        self.cache.set('video', 'https://imgur.com/d', 'd')
+        self.assertEqual([url for (_, url) in self.cache.entries],
+            ['https://imgur.com/c', 'https://imgur.com/a', 'https://imgur.com/d'])
+
+if __name__ == '__main__':
+    unittest.main()
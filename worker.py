@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+# VideoBox - a bot that creates funny videos.
+# Runs render workers on the bot's host that take jobs from the render broker in config.json.
+# Usage: python worker.py [-n WORKERS]
+
+'''Worker File'''
+
+import json
+import argparse
+import multiprocessing
+from extensions.utils.broker import Worker, get_broker
+from extensions.utils.renderer import Renderer
+
+def work(config, stop):
+    settings = config['render_broker']
+    # Each process opens its own broker, since database connections can't be shared
+    worker = Worker(get_broker(settings), Renderer(config),
+        heartbeat=settings.get('heartbeat', 5),
+        stale_timeout=settings.get('stale_timeout', 30),
+        job_timeout=settings.get('job_timeout', 600))
+    print(f'Worker {worker.name} started.')
+    try:
+        worker.run(stop)
+    except KeyboardInterrupt:
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs VideoBox render workers.')
+    parser.add_argument('-n', '--workers', type=int, default=multiprocessing.cpu_count() // 2 or 1)
+    parser.add_argument('-c', '--config', default='config.json')
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        config = json.load(f)
+    settings = config.get('render_broker') or {}
+    if settings.get('backend') != 'sqlite':
+        parser.error('render_broker in the config needs a backend that other processes can reach, like sqlite')
+
+    stop = multiprocessing.Event()
+    processes = [multiprocessing.Process(target=work, args=(config, stop)) for _ in range(args.workers)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for process in processes:
+            process.join()
+
+if __name__ == '__main__':
+    main()